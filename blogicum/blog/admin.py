@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 
-from .models import Category, Location, Post, Comment
+from .models import AuthorStats, Category, Comment, Job, Location, Post
+from .search import get_search_backend
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -14,6 +16,7 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category',
         'is_published',
+        'comment_count',
         'created_at'
     )
     list_editable = (
@@ -24,6 +27,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('category', 'author', 'location')
     list_display_links = ('title',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter_posts(
+            queryset, search_term
+        ), False
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -32,6 +42,7 @@ class CategoryAdmin(admin.ModelAdmin):
         'description',
         'slug',
         'is_published',
+        'published_post_count',
         'created_at'
     )
     list_editable = (
@@ -47,6 +58,7 @@ class LocationAdmin(admin.ModelAdmin):
     list_display = (
         'name',
         'is_published',
+        'published_post_count',
         'created_at'
     )
     list_editable = ('is_published',)
@@ -65,3 +77,50 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('post', 'author',)
     search_fields = ('text',)
     list_display_links = ('id',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter_comments(
+            queryset, search_term
+        ), False
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'published_post_count',
+        'comment_count',
+    )
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'published_post_count', 'comment_count')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'task',
+        'status',
+        'attempts',
+        'run_after',
+        'updated_at',
+    )
+    list_filter = ('status', 'task')
+    list_display_links = ('id',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'updated_at')
+    actions = ('retry_jobs',)
+
+    @admin.action(description='Перезапустить выбранные задачи')
+    def retry_jobs(self, request, queryset):
+        queryset.update(
+            status=Job.Status.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            updated_at=timezone.now()
+        )
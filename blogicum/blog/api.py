@@ -0,0 +1,170 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .constants import API_MODIFIED_TIMEOUT
+from .paginators import CursorPaginator
+from .publication import publication_epoch
+from .views import (HomePage, PostCategoryListView, PostDetailView,
+                    ProfileListView)
+
+# Столбцы, которые реально попадают в ответ; остальные не читаются
+POST_FIELDS = (
+    'id', 'title', 'pub_date', 'is_published', 'image', 'comment_count',
+    'author__username',
+    'category__slug', 'category__title', 'category__is_published',
+    'location__name', 'location__is_published',
+)
+COMMENT_FIELDS = ('id', 'text', 'created_at', 'post', 'author__username')
+
+
+def epoch_modified(epoch):
+    """Момент, когда эпоха контента была замечена впервые"""
+    return cache.get_or_set(
+        f'blog:api:modified:{epoch}',
+        lambda: int(timezone.now().timestamp()),
+        API_MODIFIED_TIMEOUT
+    )
+
+
+def serialize_post(post, with_text=False):
+    category = post.category
+    location = post.location
+    data = {
+        'id': post.id,
+        'title': post.title,
+        'pub_date': post.pub_date,
+        'author': post.author.username,
+        'category': ({'slug': category.slug, 'title': category.title}
+                     if category and category.is_published else None),
+        'location': (location.name
+                     if location and location.is_published else None),
+        'image': post.image.url if post.image else None,
+        'comment_count': post.comment_count,
+    }
+    if with_text:
+        data['text'] = post.text
+    return data
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created_at': comment.created_at,
+    }
+
+
+def serialize_page(request, page, serialize, cursor_kwarg):
+    def link(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query[cursor_kwarg] = cursor
+        return f'{request.path}?{query.urlencode()}'
+
+    return {
+        'results': [serialize(obj) for obj in page],
+        'next': link(page.next_cursor),
+        'previous': link(page.previous_cursor),
+    }
+
+
+class ConditionalApiMixin:
+    """JSON-ответ с ETag и Last-Modified по версии контента
+
+    Валидаторы строятся из эпохи публикации, которая меняется при любой
+    правке постов, комментариев, категорий, мест и пользователей и при
+    выходе отложенного поста. Поэтому повторный запрос с If-None-Match
+    получает 304, не сделав ни одного запроса к базе.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+
+    def get_etag(self, epoch):
+        # Автор видит свои скрытые посты, поэтому его ответ отличается
+        viewer = self.request.user.id or ''
+        digest = md5(
+            f'{epoch}:{viewer}:{self.request.get_full_path()}'.encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, request, *args, **kwargs):
+        epoch = publication_epoch()
+        etag = self.get_etag(epoch)
+        last_modified = epoch_modified(epoch)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_json(request, *args, **kwargs)
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def get_json(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def json_response(self, data):
+        return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+
+class PostListApiMixin(ConditionalApiMixin):
+    """Лента постов в JSON с курсорной пагинацией"""
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_queryset(self):
+        return super().get_queryset().only(*POST_FIELDS)
+
+    def get_json(self, request, *args, **kwargs):
+        paginator = CursorPaginator(
+            self.get_queryset(), self.paginate_by, self.cursor_ordering
+        )
+        try:
+            page = paginator.page(request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return self.json_response(
+            serialize_page(request, page, serialize_post, self.cursor_kwarg)
+        )
+
+
+class PostListApiView(PostListApiMixin, HomePage):
+    """Опубликованные посты"""
+
+
+class CategoryPostsApiView(PostListApiMixin, PostCategoryListView):
+    """Опубликованные посты категории"""
+
+
+class ProfilePostsApiView(PostListApiMixin, ProfileListView):
+    """Посты автора; сам автор видит и скрытые"""
+
+
+class PostDetailApiView(ConditionalApiMixin, PostDetailView):
+    """Пост с текстом и страницей комментариев"""
+
+    def get_queryset(self):
+        return super().get_queryset().only(*POST_FIELDS, 'text')
+
+    def get_comments_queryset(self):
+        return super().get_comments_queryset().only(*COMMENT_FIELDS)
+
+    def get_json(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        data = serialize_post(self.object, with_text=True)
+        data['comments'] = serialize_page(
+            request, self.get_comments_page(), serialize_comment,
+            self.comments_cursor_kwarg
+        )
+        return self.json_response(data)
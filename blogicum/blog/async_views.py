@@ -0,0 +1,179 @@
+import asyncio
+import contextvars
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404
+
+from . import views
+from .mixins import AnonymousPageCacheMixin
+from .models import Category, Comment, Post
+from .routers import on_primary
+from .utils import base_post_details, get_published_posts
+
+User = get_user_model()
+
+
+def _isolated(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_query(func, *args, **kwargs):
+    """Синхронный код с обращениями к базе, вызываемый из асинхронного
+
+    По умолчанию весь синхронный код запроса выполняется в одном потоке
+    и одном соединении, и независимые запросы идут друг за другом. С
+    настройкой BLOG_ASYNC_PARALLEL_QUERIES каждый вызов получает поток
+    из пула и своё соединение, поэтому запросы выполняются параллельно;
+    их данные видны только после фиксации транзакции.
+    """
+    if settings.BLOG_ASYNC_PARALLEL_QUERIES:
+        # run_in_executor, в отличие от sync_to_async, не передаёт в поток
+        # контекст запроса, а с ним и выбранную реплику
+        return asyncio.get_running_loop().run_in_executor(
+            None, partial(contextvars.copy_context().run, _isolated, func,
+                          *args, **kwargs)
+        )
+    return sync_to_async(func)(*args, **kwargs)
+
+
+class AsyncViewMixin:
+    """Асинхронный вид на основе синхронного класса
+
+    Django 3.2 определяет асинхронный вид по самой функции из as_view(),
+    поэтому она помечается как корутина, а служебные обработчики
+    становятся асинхронными вместе с get().
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+
+class AsyncListMixin(AsyncViewMixin):
+    """Список, страница которого загружается до построения контекста"""
+
+    paginated = None
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.paginated is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            # Шаблон рендерится позже и не должен ходить в базу за строками
+            page.object_list = list(object_list)
+            self.paginated = (paginator, page, page.object_list,
+                              is_paginated)
+        return self.paginated
+
+    def get_post_count(self):
+        # Объект ленты со счётчиком загружается одновременно со страницей
+        return None
+
+    def load_page(self, get_queryset):
+        self.object_list = get_queryset()
+        self.paginate_queryset(self.object_list,
+                               self.get_paginate_by(self.object_list))
+
+    async def load(self):
+        await run_query(self.load_page, self.get_queryset)
+
+    async def get(self, request, *args, **kwargs):
+        key = None
+        if isinstance(self, AnonymousPageCacheMixin):
+            key, response = await run_query(self.get_cached_page)
+            if response is not None:
+                return response
+        if key is None:
+            await self.load()
+            return self.render_to_response(self.get_context_data())
+        with on_primary():
+            await self.load()
+            response = self.render_to_response(self.get_context_data())
+            self.cache_page(key, response)
+            await run_query(response.render)
+        return response
+
+
+class HomePage(AsyncListMixin, views.HomePage):
+    """Главная страница сайта"""
+
+
+class PostCategoryListView(AsyncListMixin, views.PostCategoryListView):
+    """Просмотр категорий постов
+
+    Категория и страница постов не зависят друг от друга и читаются
+    одновременно: посты фильтруются по slug, а не по найденной категории.
+    """
+
+    def get_category_posts(self):
+        return base_post_details(get_published_posts().filter(
+            category__slug=self.kwargs['category_slug']
+        ))
+
+    async def load(self):
+        self.category, _ = await asyncio.gather(
+            run_query(get_object_or_404, Category,
+                      slug=self.kwargs['category_slug'], is_published=True),
+            run_query(self.load_page, self.get_category_posts),
+        )
+
+
+class ProfileListView(AsyncListMixin, views.ProfileListView):
+    """Страница профиля с параллельной загрузкой автора и его постов"""
+
+    def get_profile_posts(self):
+        username = self.kwargs['username']
+        if self.request.user.get_username() == username:
+            return base_post_details(
+                Post.objects.filter(author__username=username)
+            )
+        return base_post_details(
+            get_published_posts().filter(author__username=username)
+        )
+
+    async def load(self):
+        self.user, _ = await asyncio.gather(
+            run_query(get_object_or_404, User.objects.select_related('stats'),
+                      username=self.kwargs['username']),
+            run_query(self.load_page, self.get_profile_posts),
+        )
+
+
+class PostDetailView(AsyncViewMixin, views.PostDetailView):
+    """Страница поста; пост и комментарии читаются одновременно"""
+
+    comments_page = None
+
+    def get_comments_queryset(self):
+        return Comment.objects.filter(
+            post_id=self.kwargs['post_id']
+        ).select_related('author')
+
+    def get_comments_page(self):
+        if self.comments_page is None:
+            self.comments_page = super().get_comments_page()
+        return self.comments_page
+
+    async def get(self, request, *args, **kwargs):
+        self.object, _ = await asyncio.gather(
+            run_query(self.get_object),
+            run_query(self.get_comments_page),
+        )
+        return self.render_to_response(
+            self.get_context_data(object=self.object)
+        )
@@ -0,0 +1,28 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .cache import get_versions
+from .constants import USER_CACHE_TIMEOUT
+from .routers import on_primary
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кэша
+
+    Ключ включает версию пользователя, а она меняется при каждом его
+    сохранении: правке профиля, смене пароля, входе на сайт. При промахе
+    пользователь читается с основной базы, а не с реплики. Права
+    по-прежнему читаются из базы и в кэш не попадают.
+    """
+
+    def get_user(self, user_id):
+        version, = get_versions(('user', user_id))
+        key = f'blog:user:{user_id}:{version}'
+        user = cache.get(key)
+        if user is None:
+            with on_primary():
+                user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_CACHE_TIMEOUT)
+            return user
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,13 @@
+from django.db.backends.postgresql import base, creation
+
+from blog.db import PooledCreationMixin, PooledDatabaseMixin
+
+
+class DatabaseCreation(PooledCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseMixin, base.DatabaseWrapper):
+    """Бэкенд postgresql с пулом соединений из blog.db"""
+
+    creation_class = DatabaseCreation
@@ -0,0 +1,13 @@
+from django.db.backends.sqlite3 import base, creation
+
+from blog.db import PooledCreationMixin, PooledDatabaseMixin
+
+
+class DatabaseCreation(PooledCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseMixin, base.DatabaseWrapper):
+    """Бэкенд sqlite3 с пулом соединений из blog.db"""
+
+    creation_class = DatabaseCreation
@@ -0,0 +1,552 @@
+import asyncio
+import math
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.client import HTTPConnection
+from importlib import import_module, reload
+from itertools import cycle, islice
+from pathlib import Path
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.template import Engine, RequestContext, engines
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+from .db import close_pools
+from .models import Comment
+from .utils import get_published_posts
+from .views import HomePage
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench_admin'
+
+
+class BenchmarkError(Exception):
+    """Маршрут ответил не тем статусом, что ожидался"""
+
+
+Route = namedtuple('Route', 'name method auth status build')
+
+
+class BenchmarkData:
+    """Объекты из базы, на которые ссылаются запросы бенчмарка"""
+
+    def __init__(self, sample_size=50):
+        self.user, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={'is_staff': True, 'is_superuser': True},
+        )
+        posts = list(get_published_posts().select_related(
+            'category', 'author'
+        ).order_by('-pub_date')[:sample_size])
+        if not posts:
+            raise BenchmarkError('В базе нет опубликованных постов')
+        self.posts = posts
+        self.post = posts[0]
+
+    def comments(self, count):
+        return [Comment.objects.create(post=self.post, author=self.user,
+                                       text='Комментарий')
+                for _ in range(count)]
+
+
+def _post_paths(data, count):
+    return [(f'/posts/{post.id}/', None)
+            for post in islice(cycle(data.posts), count)]
+
+
+def _comment_paths(action, data, count):
+    return [(f'/posts/{comment.post_id}/{action}/{comment.id}/'
+             if action == 'edit_comment' else
+             f'/posts/{comment.post_id}/{action}/{comment.id}',
+             {'text': 'Изменённый комментарий'})
+            for comment in data.comments(count)]
+
+
+ROUTES = (
+    Route('index', 'GET', False, 200,
+          lambda data, count: [('/', None)] * count),
+    Route('index_auth', 'GET', True, 200,
+          lambda data, count: [('/', None)] * count),
+    Route('category', 'GET', False, 200, lambda data, count: [
+        (f'/category/{data.post.category.slug}/', None)
+    ] * count),
+    Route('profile', 'GET', False, 200, lambda data, count: [
+        (f'/profile/{data.post.author.username}/', None)
+    ] * count),
+    Route('post_detail', 'GET', False, 200, _post_paths),
+    Route('add_comment', 'POST', True, 302, lambda data, count: [
+        (f'/posts/{data.post.id}/comment/', {'text': 'Комментарий'})
+    ] * count),
+    Route('edit_comment', 'POST', True, 302,
+          lambda data, count: _comment_paths('edit_comment', data, count)),
+    Route('delete_comment', 'POST', True, 302,
+          lambda data, count: _comment_paths('delete_comment', data, count)),
+    Route('admin_posts', 'GET', True, 200,
+          lambda data, count: [('/admin/blog/post/', None)] * count),
+    Route('admin_comments', 'GET', True, 200,
+          lambda data, count: [('/admin/blog/comment/', None)] * count),
+)
+
+
+def session_cookies(user):
+    """Заголовок Cookie с сессией пользователя и CSRF-токен к нему"""
+    client = Client()
+    client.force_login(user)
+    request = HttpRequest()
+    csrf_token = get_token(request)
+    return '; '.join((
+        f'{settings.SESSION_COOKIE_NAME}='
+        f'{client.cookies[settings.SESSION_COOKIE_NAME].value}',
+        f'{settings.CSRF_COOKIE_NAME}={request.META["CSRF_COOKIE"]}',
+    )), csrf_token
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django, без сети"""
+
+    name = 'client'
+    concurrent = False
+
+    def __init__(self, user):
+        self.clients = {False: Client(), True: Client()}
+        self.clients[True].force_login(user)
+
+    def request(self, method, path, data, auth):
+        client = self.clients[auth]
+        response = (client.get(path) if method == 'GET'
+                    else client.post(path, data or {}))
+        return response.status_code, response.get('X-Query-Count')
+
+    def close(self):
+        pass
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class WSGITransport:
+    """Запросы по HTTP к локальному WSGI-серверу в отдельном потоке
+
+    Сервер, как и runserver, обрабатывает каждое соединение в своём
+    потоке, поэтому параллельные запросы выполняются одновременно.
+    """
+
+    name = 'wsgi'
+    concurrent = True
+
+    def __init__(self, user):
+        self.server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                                  server_class=ThreadedWSGIServer,
+                                  handler_class=QuietRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.cookies, self.csrf_token = session_cookies(user)
+
+    def request(self, method, path, data, auth):
+        headers = {'Cookie': self.cookies} if auth else {}
+        body = None
+        if method == 'POST':
+            body = urlencode(data or {})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.csrf_token
+        http = HTTPConnection(*self.server.server_address, timeout=60)
+        try:
+            http.request(method, path, body, headers)
+            response = http.getresponse()
+            response.read()
+            return response.status, response.getheader('X-Query-Count')
+        finally:
+            http.close()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class ASGITransport:
+    """Запросы к ASGI-приложению в цикле событий отдельного потока
+
+    Как и под uvicorn, все запросы обслуживает один цикл событий, а
+    синхронный код Django выполняется через sync_to_async.
+    """
+
+    name = 'asgi'
+    concurrent = True
+
+    def __init__(self, user):
+        self.application = get_asgi_application()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.cookies, self.csrf_token = session_cookies(user)
+
+    async def call(self, method, path, body, headers):
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': method, 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(name.lower().encode(), value.encode())
+                        for name, value in headers.items()],
+            'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+        }
+        messages = [{'type': 'http.request', 'body': body,
+                     'more_body': False}]
+        response = {}
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Клиент не отключается, пока ответ не отправлен
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                # Django передаёт имена заголовков без приведения регистра
+                response['headers'] = {name.lower(): value for name, value
+                                       in message['headers']}
+
+        await self.application(scope, receive, send)
+        query_count = response['headers'].get(b'x-query-count')
+        return (response['status'],
+                query_count.decode() if query_count else None)
+
+    def request(self, method, path, data, auth):
+        headers = {'Host': 'localhost'}
+        if auth:
+            headers['Cookie'] = self.cookies
+        body = b''
+        if method == 'POST':
+            body = urlencode(data or {}).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.csrf_token
+        return asyncio.run_coroutine_threadsafe(
+            self.call(method, path, body, headers), self.loop
+        ).result(60)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+TRANSPORTS = {
+    transport.name: transport for transport in (ClientTransport,
+                                                WSGITransport,
+                                                ASGITransport)
+}
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, в Linux — в килобайтах
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_route(transport, route, data, requests, warmup, concurrency=1):
+    planned = route.build(data, warmup + requests)
+
+    def send(item):
+        path, payload = item
+        start = time.perf_counter()
+        status, query_count = transport.request(route.method, path, payload,
+                                                route.auth)
+        elapsed = time.perf_counter() - start
+        if status != route.status:
+            raise BenchmarkError(
+                f'{route.name}: {route.method} {path} вернул {status}, '
+                f'ожидался {route.status}'
+            )
+        return elapsed, query_count
+
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(send, planned[:warmup]))
+            started = time.perf_counter()
+            measured = list(pool.map(send, planned[warmup:]))
+            wall = time.perf_counter() - started
+    else:
+        list(map(send, planned[:warmup]))
+        started = time.perf_counter()
+        measured = list(map(send, planned[warmup:]))
+        wall = time.perf_counter() - started
+    timings = [elapsed for elapsed, _ in measured]
+    queries = [int(count) for _, count in measured if count is not None]
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'rps': round(len(timings) / wall, 1) if wall else None,
+        'queries': (round(sum(queries) / len(queries), 2)
+                    if queries else None),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def production_middleware():
+    """Промежуточные слои сайта без инструментов разработки
+
+    Панель отладки есть только в профиле dev, замедляет каждый ответ и
+    работает лишь синхронно, поэтому под ASGI переводила бы всю цепочку
+    в поток.
+    """
+    return [path for path in settings.MIDDLEWARE
+            if path not in settings.DEV_MIDDLEWARE]
+
+
+@contextmanager
+def read_views(async_views):
+    """Подменяет страницы для чтения на синхронные или асинхронные"""
+    if settings.BLOG_ASYNC_VIEWS == async_views:
+        yield
+        return
+    modules = [import_module('blog.urls'),
+               import_module(settings.ROOT_URLCONF)]
+
+    def reload_urls():
+        for module in modules:
+            reload(module)
+        clear_url_caches()
+
+    try:
+        with override_settings(BLOG_ASYNC_VIEWS=async_views):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+# Кэш прогонов: общий кэш сайта бенчмарк не очищает и не заполняет
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-bench',
+    }
+}
+
+
+@contextmanager
+def private_cache():
+    """Подменяет кэш пустым локальным кэшем процесса на время прогона
+
+    Настроенный кэш общий с работающим сайтом: его очистка сбросила бы
+    кэш сайта, а страницы и карточки синтетических постов попали бы под
+    ключи, которые читает сайт.
+    """
+    with override_settings(CACHES=BENCH_CACHES):
+        cache.clear()
+        yield
+
+
+@contextmanager
+def database_profile(conn_max_age=None, pool_size=None):
+    """Временно меняет время жизни соединений и размер пула
+
+    Настройки базы общие для всех потоков, и соединение потока создаётся
+    по ним при первом запросе. Поэтому изменения касаются потоков
+    серверов wsgi и asgi, но не открытого уже соединения текущего потока.
+    """
+    settings_dict = connection.settings_dict
+    keys = ('ENGINE', 'CONN_MAX_AGE', 'POOL_SIZE')
+    previous = {key: settings_dict.get(key) for key in keys}
+    if conn_max_age is not None:
+        settings_dict['CONN_MAX_AGE'] = conn_max_age
+    if pool_size is not None:
+        engine = settings_dict['ENGINE'].rsplit('.', 1)[1]
+        settings_dict['POOL_SIZE'] = pool_size
+        settings_dict['ENGINE'] = (f'blog.backends.{engine}' if pool_size
+                                   else f'django.db.backends.{engine}')
+    try:
+        yield
+    finally:
+        settings_dict.update(previous)
+        close_pools()
+
+
+def run_benchmark(mode='client', routes=None, requests=50, warmup=5,
+                  concurrency=1, async_views=False):
+    """Прогоняет маршруты и возвращает отчёт по каждому из них"""
+    transport_class = TRANSPORTS[mode]
+    if concurrency > 1 and not transport_class.concurrent:
+        raise BenchmarkError(
+            f'Режим {mode} не поддерживает параллельные запросы'
+        )
+    selected = [route for route in ROUTES
+                if routes is None or route.name in routes]
+    results = {}
+    with private_cache(), read_views(async_views), override_settings(
+        MIDDLEWARE=production_middleware()
+    ):
+        data = BenchmarkData()
+        transport = transport_class(data.user)
+        try:
+            for route in selected:
+                cache.clear()
+                results[route.name] = run_route(transport, route, data,
+                                                requests, warmup,
+                                                concurrency)
+        finally:
+            transport.close()
+    return {
+        'mode': mode,
+        'database': connection.vendor,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'pool_size': connection.settings_dict.get('POOL_SIZE') or 0,
+        'requests': requests,
+        'warmup': warmup,
+        'concurrency': concurrency,
+        'async_views': async_views,
+        'routes': results,
+    }
+
+
+def compare(report, baseline, threshold=0.2):
+    """Регрессии относительно сохранённого отчёта
+
+    Маршрут считается медленнее, если его p95 вырос больше чем на долю
+    threshold, и тяжелее, если в среднем стал делать больше запросов.
+    """
+    regressions = []
+    for name, current in report['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(
+                f'{name}: p95 {previous["p95_ms"]} -> {current["p95_ms"]} мс'
+            )
+        if (current['queries'] is not None
+                and previous.get('queries') is not None
+                and current['queries'] > previous['queries']):
+            regressions.append(
+                f'{name}: запросов {previous["queries"]} -> '
+                f'{current["queries"]}'
+            )
+    return regressions
+
+
+TEMPLATE_LOADERS = {
+    'uncached': lambda loaders: loaders,
+    'cached': lambda loaders: [
+        ('django.template.loaders.cached.Loader', loaders)
+    ],
+    'inlined': lambda loaders: [
+        ('django.template.loaders.cached.Loader',
+         [('blog.templating.InliningLoader', loaders)])
+    ],
+}
+
+
+def template_engine(loaders):
+    """Движок с настройками основного, но с заданными загрузчиками"""
+    base = engines['django'].engine
+    return Engine(
+        dirs=base.dirs, context_processors=base.context_processors,
+        loaders=TEMPLATE_LOADERS[loaders](settings.TEMPLATE_LOADERS),
+        libraries=base.libraries,
+        builtins=[name for name in base.builtins
+                  if name not in Engine.default_builtins],
+    )
+
+
+def run_render_benchmark(loaders=tuple(TEMPLATE_LOADERS), renders=100,
+                         warmup=5, template_name='blog/index.html'):
+    """Время рендера ленты для разных загрузчиков шаблонов
+
+    Контекст берётся у главной страницы, запросы к базе выполняются до
+    замеров. Перед каждым рендером кэш очищается, чтобы карточки постов
+    тоже собирались из шаблона, а не брались готовыми.
+    """
+    with private_cache():
+        cache.clear()
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context_data = HomePage.as_view()(request).context_data
+        results = {}
+        for name in loaders:
+            engine = template_engine(name)
+            timings = []
+            for index in range(warmup + renders):
+                cache.clear()
+                started = time.perf_counter()
+                engine.get_template(template_name).render(
+                    RequestContext(request, context_data)
+                )
+                if index >= warmup:
+                    timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                'renders': renders,
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+            }
+    return {
+        'template': template_name,
+        'posts': len(context_data['page_obj']),
+        'warmup': warmup,
+        'loaders': results,
+    }
+
+
+@contextmanager
+def isolated_database():
+    """Временная база по образцу тестовой, удаляемая после прогона
+
+    SQLite создаётся в файле, а не в памяти, чтобы поток WSGI-сервера
+    открывал к ней собственное соединение.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(directory) / 'bench.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                           serialize=False)
+        try:
+            with private_cache():
+                yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
@@ -0,0 +1,38 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+FEED_PAGES = ('pages', 'feed')
+# Меняется, только когда может измениться число постов в лентах
+POST_COUNTS = ('counts', 'posts')
+
+
+def version_key(kind, pk):
+    return f'blog:version:{kind}:{pk}'
+
+
+def bump_version(kind, pk):
+    """Делает недействительными все фрагменты, зависящие от объекта"""
+    if pk is not None:
+        cache.set(version_key(kind, pk), uuid4().hex, None)
+
+
+def get_versions(*objects):
+    """Версии объектов (kind, pk); отсутствующие создаются заново"""
+    keys = [version_key(kind, pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def post_card_key(post):
+    versions = get_versions(
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
+    return f"blog:post_card:{post.pk}:{':'.join(versions)}"
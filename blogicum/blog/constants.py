@@ -1,3 +1,21 @@
 MAX_LENGTH = 256
 NUM_CHAR_OUTPUT = 15
 POST_VALUE_PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+PAGE_CACHE_TIMEOUT = 60 * 5
+POST_COUNT_CACHE_TIMEOUT = 60 * 60
+PUBLICATION_STATE_TIMEOUT = 60
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_QUALITY = 80
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 30
+JOB_STALE_TIMEOUT = 60 * 10
+SEARCH_RESULTS_LIMIT = 1000
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_COMMENT_WEIGHT = 0.5
+SEARCH_RECENCY_HALF_LIFE = 60 * 60 * 24 * 365 * 5
+SEARCH_RECENCY_MAX_HALF_LIVES = 500
+EXPORT_CHUNK_SIZE = 2000
+API_MODIFIED_TIMEOUT = 60 * 60 * 24
+USER_CACHE_TIMEOUT = 60 * 5
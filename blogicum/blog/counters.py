@@ -0,0 +1,181 @@
+from collections import Counter, defaultdict
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import AuthorStats, Category, Comment, Location, Post
+from .routers import on_primary
+
+# Пачка id в одном UPDATE ... WHERE id IN (...)
+UPDATE_BATCH_SIZE = 500
+
+
+def visible_q(now=None):
+    """Условие, при котором пост входит в счётчики опубликованных"""
+    return Q(is_published=True,
+             pub_date__lte=now or timezone.now(),
+             category__is_published=True)
+
+
+def _increment(model, field, counter):
+    # Объекты с одинаковой дельтой обновляются одним запросом
+    by_delta = defaultdict(list)
+    for pk, delta in counter.items():
+        if pk is not None and delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(**{
+            field: F(field) + delta
+        })
+
+
+def apply_post_deltas(rows, delta):
+    """Прибавляет delta к счётчикам по строкам (категория, место, автор)"""
+    categories, locations, authors = Counter(), Counter(), Counter()
+    for category_id, location_id, author_id in rows:
+        categories[category_id] += delta
+        locations[location_id] += delta
+        authors[author_id] += delta
+    _increment(Category, 'published_post_count', categories)
+    _increment(Location, 'published_post_count', locations)
+    _increment(AuthorStats, 'published_post_count', authors)
+
+
+def change_author_comments(author_id, delta):
+    AuthorStats.objects.filter(pk=author_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def _locked(queryset):
+    features = connection.features
+    if (features.has_select_for_update_skip_locked
+            and features.has_select_for_update_of):
+        return queryset.select_for_update(skip_locked=True, of=('self',))
+    return queryset
+
+
+def _sync(subset, delta):
+    # Отставшая реплика вернула бы уже учтённые посты
+    with on_primary():
+        return _sync_rows(subset, delta)
+
+
+def _sync_rows(subset, delta):
+    # Без работы обходимся одним чтением, без транзакции и блокировок
+    if not subset.exists():
+        return 0
+    with transaction.atomic():
+        rows = list(_locked(subset).values_list(
+            'pk', 'category_id', 'location_id', 'author_id'
+        ))
+        for start in range(0, len(rows), UPDATE_BATCH_SIZE):
+            Post.objects.filter(pk__in=[
+                row[0] for row in rows[start:start + UPDATE_BATCH_SIZE]
+            ]).update(is_counted=delta > 0)
+        apply_post_deltas((row[1:] for row in rows), delta)
+    return len(rows)
+
+
+def sync_post_counters(queryset, now=None):
+    """Учитывает ставшие видимыми посты и снимает скрытые
+
+    Флаг is_counted хранит, вошёл ли пост в счётчики, поэтому
+    повторный вызов для тех же постов ничего не меняет.
+    """
+    visible = visible_q(now)
+    return (_sync(queryset.filter(visible, is_counted=False), 1)
+            + _sync(queryset.filter(~visible, is_counted=True), -1))
+
+
+def uncounted_q(now=None):
+    """Видимые посты, ещё не попавшие в счётчики"""
+    return visible_q(now) & Q(is_counted=False)
+
+
+def go_live(now=None):
+    """Учитывает отложенные посты, дата публикации которых наступила"""
+    return _sync(Post.objects.filter(uncounted_q(now)), 1)
+
+
+def _recount(queryset, field, actual):
+    return queryset.annotate(
+        actual=Coalesce(Subquery(actual), 0)
+    ).exclude(**{field: F('actual')}).update(**{
+        field: Coalesce(Subquery(actual), 0)
+    })
+
+
+def _author_comments(comment):
+    return comment.objects.filter(
+        author=OuterRef('pk')
+    ).order_by().values('author').annotate(total=Count('pk')).values('total')
+
+
+def recount_author_comments(author_ids):
+    """Пересчитывает число комментариев указанных авторов"""
+    return _recount(AuthorStats.objects.filter(pk__in=author_ids),
+                    'comment_count', _author_comments(Comment))
+
+
+def _published(post, field):
+    return post.objects.filter(
+        is_counted=True, **{field: OuterRef('pk')}
+    ).order_by().values(field).annotate(total=Count('pk')).values('total')
+
+
+def recount_published(categories=(), locations=(), authors=()):
+    """Пересчитывает число учтённых постов у указанных объектов"""
+    repaired = 0
+    for model, pks, field in ((Category, categories, 'category'),
+                              (Location, locations, 'location'),
+                              (AuthorStats, authors, 'author')):
+        if pks:
+            repaired += _recount(model.objects.filter(pk__in=pks),
+                                 'published_post_count',
+                                 _published(Post, field))
+    return repaired
+
+
+def recount_counters(apps=global_apps, now=None):
+    """Пересчитывает флаги и все счётчики запросами к таблицам целиком
+
+    Возвращает число исправленных строк по моделям.
+    """
+    post = apps.get_model('blog', 'Post')
+    comment = apps.get_model('blog', 'Comment')
+    stats = apps.get_model('blog', 'AuthorStats')
+    user = apps.get_model(settings.AUTH_USER_MODEL)
+    visible = visible_q(now)
+    repaired = {}
+    with transaction.atomic():
+        repaired['post'] = (
+            post.objects.filter(visible, is_counted=False).update(
+                is_counted=True
+            )
+            + post.objects.filter(~visible, is_counted=True).update(
+                is_counted=False
+            )
+        )
+        missing = user.objects.filter(stats__isnull=True).values_list(
+            'pk', flat=True
+        )
+        stats.objects.bulk_create(
+            [stats(user_id=pk) for pk in missing], ignore_conflicts=True
+        )
+        for name in ('category', 'location'):
+            model = apps.get_model('blog', name)
+            repaired[name] = _recount(model.objects.all(),
+                                      'published_post_count',
+                                      _published(post, name))
+        repaired['author'] = (
+            _recount(stats.objects.all(), 'published_post_count',
+                     _published(post, 'author'))
+            + _recount(stats.objects.all(), 'comment_count',
+                       _author_comments(comment))
+        )
+    return repaired
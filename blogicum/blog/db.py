@@ -0,0 +1,114 @@
+import threading
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Открытые соединения драйвера, общие для всех потоков процесса
+
+    Пул не ограничивает число одновременно открытых соединений: если
+    свободных нет, открывается новое. Вернувшиеся сверх size закрываются.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self, connect):
+        """Свободное соединение и признак того, что оно уже работало"""
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return connect(), False
+
+    def release(self, raw):
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(raw)
+                return
+        raw.close()
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for raw in idle:
+            raw.close()
+
+
+def get_pool(alias, settings_dict):
+    """Пул для базы; тестовая база с другим именем получает свой"""
+    key = (alias, str(settings_dict['NAME']))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(settings_dict.get('POOL_SIZE', 0))
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+class PooledDatabaseMixin:
+    """Соединение берётся из пула, а при закрытии возвращается в него
+
+    Перед возвратом незавершённая транзакция откатывается. Соединение,
+    закрытое внутри atomic, сломанное или не давшее откатиться, в пул
+    не попадает.
+    """
+
+    reused = False
+
+    def get_new_connection(self, conn_params):
+        raw, self.reused = get_pool(self.alias, self.settings_dict).acquire(
+            lambda: super(PooledDatabaseMixin, self).get_new_connection(
+                conn_params
+            )
+        )
+        return raw
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Внутри atomic обёртка сохраняет ссылку на соединение
+        reusable = not self.in_atomic_block and (
+            not self.errors_occurred or self.is_usable()
+        )
+        if reusable and not self.get_autocommit():
+            try:
+                self.connection.rollback()
+            except self.Database.Error:
+                reusable = False
+        if not reusable:
+            with self.wrap_database_errors:
+                return self.connection.close()
+        get_pool(self.alias, self.settings_dict).release(self.connection)
+
+
+class PooledCreationMixin:
+    """Перед удалением тестовой базы закрывает соединения пулов"""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Настраивает новое соединение SQLite по BLOG_SQLITE_PRAGMAS
+
+    Запросы идут мимо курсора Django и не попадают в учёт запросов.
+    """
+    if connection.vendor != 'sqlite' or getattr(connection, 'reused', False):
+        return
+    for name, value in settings.BLOG_SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,135 @@
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .constants import EXPORT_CHUNK_SIZE
+from .models import Category, Comment, Location, Post
+
+# Порядок важен: при загрузке связанные объекты должны идти раньше
+EXPORT_MODELS = {
+    'category': Category,
+    'location': Location,
+    'post': Post,
+    'comment': Comment,
+}
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+# Поле даты и пути к категории и автору, по которым фильтруется модель
+FILTER_FIELDS = {
+    'category': ('created_at', 'slug', None),
+    'location': ('created_at', None, None),
+    'post': ('pub_date', 'category__slug', 'author__username'),
+    'comment': ('created_at', 'post__category__slug', 'author__username'),
+}
+
+
+class ExportError(ValueError):
+    """Некорректные параметры выгрузки"""
+
+
+def parse_moment(value, end=False):
+    """Дата или дата со временем; дата без времени включает весь день"""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ExportError(f'Некорректная дата: {value}')
+        moment = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_cursor(value):
+    """Курсор вида post:123 — последняя уже выгруженная запись"""
+    if not value:
+        return None
+    name, _, pk = value.partition(':')
+    if name not in EXPORT_MODELS or not pk.isdigit():
+        raise ExportError(f'Некорректный курсор: {value}')
+    return name, int(pk)
+
+
+def _filter(name, queryset, date_from, date_to, category, author):
+    """Queryset с фильтрами или None, если модель под фильтр не подходит"""
+    date_field, category_path, author_path = FILTER_FIELDS[name]
+    if (category and category_path is None
+            or author and author_path is None):
+        return None
+    if date_from:
+        queryset = queryset.filter(**{f'{date_field}__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{date_field}__lte': date_to})
+    if category:
+        queryset = queryset.filter(**{category_path: category})
+    if author:
+        queryset = queryset.filter(**{author_path: author})
+    return queryset
+
+
+def export_querysets(models=None, date_from=None, date_to=None,
+                     category=None, author=None, after=None):
+    """Пары (имя модели, queryset) в порядке выгрузки"""
+    models = models or list(EXPORT_MODELS)
+    unknown = set(models) - set(EXPORT_MODELS)
+    if unknown:
+        raise ExportError(f'Неизвестные модели: {", ".join(sorted(unknown))}')
+    date_from = parse_moment(date_from)
+    date_to = parse_moment(date_to, end=True)
+    cursor = parse_cursor(after)
+    names = list(EXPORT_MODELS)
+    for name in names:
+        if name not in models or (
+            cursor and names.index(name) < names.index(cursor[0])
+        ):
+            continue
+        queryset = EXPORT_MODELS[name].objects.order_by('pk')
+        if cursor and cursor[0] == name:
+            queryset = queryset.filter(pk__gt=cursor[1])
+        queryset = _filter(name, queryset, date_from, date_to, category,
+                           author)
+        if queryset is not None:
+            yield name, queryset
+
+
+def export_records(chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    """Записи в формате dumpdata, читаемые из базы пачками"""
+    for name, queryset in export_querysets(**filters):
+        model = queryset.model
+        label = model._meta.label_lower
+        fields = [field.name for field in model._meta.concrete_fields
+                  if not field.primary_key]
+        for row in queryset.values('pk', *fields).iterator(
+            chunk_size=chunk_size
+        ):
+            pk = row.pop('pk')
+            yield {'model': label, 'pk': pk, 'fields': row}
+
+
+def stream_export(output_format='ndjson', **filters):
+    """Строки выгрузки; в памяти одновременно не больше одной пачки"""
+    if output_format not in FORMATS:
+        raise ExportError(f'Неизвестный формат: {output_format}')
+    records = export_records(**filters)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    if output_format == 'ndjson':
+        for record in records:
+            yield encoder.encode(record) + '\n'
+        return
+    separator = '[\n'
+    for record in records:
+        yield separator + encoder.encode(record)
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def check_filters(**filters):
+    """Проверяет параметры до начала потоковой выдачи"""
+    for _ in export_querysets(**filters):
+        pass
@@ -0,0 +1,91 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+from .models import Post
+
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def variant_widths(original_width):
+    widths = [width for width in IMAGE_VARIANT_WIDTHS
+              if width < original_width]
+    return widths or [original_width]
+
+
+def build_image_variants(image_field):
+    """Уменьшенные копии фото в форматах WebP и JPEG
+
+    Копии сохраняются рядом с оригиналом в подкаталоге ``variants``.
+    Возвращает словарь ``{формат: {ширина: имя файла}}``.
+    """
+    with image_field.open('rb') as file:
+        with Image.open(file) as original:
+            original.load()
+            image = original.convert('RGB')
+    storage = image_field.storage
+    path = PurePosixPath(image_field.name)
+    variants = {}
+    for key, (image_format, extension) in VARIANT_FORMATS.items():
+        for width in variant_widths(image.width):
+            resized = image.copy()
+            resized.thumbnail((width, resized.height))
+            buffer = BytesIO()
+            resized.save(buffer, image_format,
+                         quality=IMAGE_VARIANT_QUALITY, optimize=True)
+            name = storage.save(
+                str(path.parent / 'variants'
+                    / f'{path.stem}_{width}.{extension}'),
+                ContentFile(buffer.getvalue())
+            )
+            variants.setdefault(key, {})[str(width)] = name
+    return variants
+
+
+def delete_image_variants(storage, variants):
+    for names in variants.values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def strip_exif(image_field):
+    """Удаляет EXIF из оригинала, предварительно применив ориентацию"""
+    with image_field.open('rb') as file:
+        with Image.open(file) as original:
+            if not original.getexif() or original.format not in (
+                    'JPEG', 'PNG', 'WEBP'):
+                return False
+            image_format = original.format
+            image = ImageOps.exif_transpose(original)
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=95)
+    storage = image_field.storage
+    name = image_field.name
+    storage.delete(name)
+    image_field.name = storage.save(name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def process_post_image(post):
+    """Пересоздаёт уменьшенные копии фото поста"""
+    storage = post._meta.get_field('image').storage
+    delete_image_variants(storage, post.image_variants or {})
+    update_fields = ['image_variants']
+    if post.image and strip_exif(post.image):
+        update_fields.append('image')
+    post.image_variants = (
+        build_image_variants(post.image) if post.image else {}
+    )
+    post.save(update_fields=update_fields)
+
+
+def process_post_image_job(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        process_post_image(post)
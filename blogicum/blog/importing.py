@@ -0,0 +1,294 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import BooleanField, Max, Q
+from django.utils import timezone
+
+from .cache import FEED_PAGES, POST_COUNTS, bump_version
+from .counters import recount_author_comments, recount_published
+from .models import Category, Comment, Location, Post
+from .publication import reset_publication_state
+from .search import get_search_backend
+from .seeding import bulk_insert
+from .utils import recount_comment_counts
+
+User = get_user_model()
+
+BOOLEANS = {'true': True, 'yes': True, 'да': True,
+            'false': False, 'no': False, 'нет': False}
+
+
+# Естественный ключ подходит нескольким объектам
+AMBIGUOUS = object()
+
+
+class ImportAborted(Exception):
+    """Ошибок больше, чем разрешено"""
+
+
+class RowError(ValueError):
+    """Строку не удалось разобрать"""
+
+
+def read_rows(stream, input_format):
+    """Пары (номер строки, словарь) из потока NDJSON или CSV
+
+    Записи выгрузки в формате dumpdata разворачиваются в свои поля,
+    а вместо неразобранной строки отдаётся RowError.
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield number, RowError(f'Некорректный JSON: {error}')
+            continue
+        if not isinstance(row, dict):
+            yield number, RowError('Ожидался JSON-объект')
+            continue
+        yield number, row.get('fields', row)
+
+
+class BaseImporter:
+    """Пакетный импорт: проверка, разрешение ссылок и вставка пачками
+
+    Ссылки на связанные объекты задаются числом (id) или строкой
+    (естественный ключ: username, slug, название). Для каждой пачки
+    неизвестные ключи ищутся одним запросом на модель, найденные
+    запоминаются в словарях на всё время импорта. Строки с ключом,
+    которому соответствует несколько объектов, отклоняются. Поля
+    auto_now_add пишутся из строки, а без значения получают время
+    начала импорта.
+    """
+
+    model = None
+    fields = ()
+    references = {}
+    # Поля связанных объектов, которые читаются вместе с их ключами
+    reference_fields = {}
+
+    def __init__(self, batch_size=1000, max_errors=100, dry_run=False):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.dry_run = dry_run
+        self.now = timezone.now()
+        self.maps = {name: {} for name in self.references}
+        self.reference_values = {name: {} for name in self.reference_fields}
+        self.created = 0
+        self.errors = []
+        self.last_pk = self.model.objects.aggregate(
+            last=Max('pk')
+        )['last'] or 0
+
+    def reference_key(self, name, value):
+        """Число — id, строка — естественный ключ, пусто — None"""
+        if value is None or value == '':
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return repr(value)
+        if (self.references[name][1] == 'pk' and isinstance(value, str)
+                and value.strip().isdigit()):
+            return int(value)
+        return value
+
+    def resolve(self, rows):
+        for name, (model, lookup) in self.references.items():
+            known = self.maps[name]
+            keys = {self.reference_key(name, row.get(name)) for row in rows}
+            keys -= set(known) | {None}
+            if not keys:
+                continue
+            ids = [key for key in keys if isinstance(key, int)]
+            names = [key for key in keys
+                     if isinstance(key, str) and lookup != 'pk']
+            for key in keys:
+                known[key] = None
+            fields = self.reference_fields.get(name, ())
+            for pk, natural, *values in model.objects.filter(
+                Q(pk__in=ids) | Q(**{f'{lookup}__in': names})
+            ).values_list('pk', lookup, *fields):
+                if fields:
+                    self.reference_values[name][pk] = dict(zip(fields,
+                                                               values))
+                if pk in keys:
+                    known[pk] = pk
+                if natural in keys:
+                    known[natural] = (pk if known[natural] in (None, pk)
+                                      else AMBIGUOUS)
+
+    def assign_references(self, obj, row):
+        """Проставляет id связанных объектов и возвращает ошибки"""
+        errors = {}
+        for name, (model, lookup) in self.references.items():
+            key = self.reference_key(name, row.get(name))
+            field = self.model._meta.get_field(name)
+            if key is None:
+                if not field.null:
+                    errors[name] = ['Обязательное поле.']
+                continue
+            pk = self.maps[name].get(key)
+            if pk is None:
+                errors[name] = [f'Не найден объект {model.__name__}: {key}']
+            elif pk is AMBIGUOUS:
+                errors[name] = [f'Несколько объектов {model.__name__} с '
+                                f'ключом {key}, укажите id']
+                pk = None
+            setattr(obj, field.attname, pk)
+        return errors
+
+    def build(self, row):
+        obj = self.model()
+        for name in self.fields:
+            value = row.get(name)
+            if (isinstance(value, str) and isinstance(
+                    self.model._meta.get_field(name), BooleanField)):
+                value = BOOLEANS.get(value.strip().lower(), value)
+            if value is not None:
+                setattr(obj, name, value)
+        errors = self.assign_references(obj, row)
+        try:
+            obj.full_clean(exclude=list(self.references),
+                           validate_unique=False)
+        except ValidationError as error:
+            errors.update(error.message_dict)
+        if errors:
+            raise ValidationError(errors)
+        for field in self.model._meta.concrete_fields:
+            value = getattr(obj, field.attname)
+            if value in (None, '') and getattr(field, 'auto_now_add', False):
+                setattr(obj, field.attname, self.now)
+            elif hasattr(value, 'tzinfo') and timezone.is_naive(value):
+                setattr(obj, field.attname, timezone.make_aware(value))
+        return obj
+
+    def reject(self, number, messages):
+        self.errors.append((number, messages))
+        if len(self.errors) > self.max_errors:
+            raise ImportAborted(
+                f'Превышен лимит ошибок: {self.max_errors}'
+            )
+
+    def import_batch(self, batch):
+        rows = [row for _, row in batch if not isinstance(row, RowError)]
+        self.resolve(rows)
+        objects = []
+        for number, row in batch:
+            if isinstance(row, RowError):
+                self.reject(number, {'__all__': [str(row)]})
+                continue
+            try:
+                objects.append(self.build(row))
+            except ValidationError as error:
+                self.reject(number, error.message_dict)
+        if objects and not self.dry_run:
+            with transaction.atomic():
+                # bulk_create заменил бы перенесённые даты auto_now_add
+                bulk_insert(self.model, objects, self.batch_size)
+                self.after_batch(objects)
+        self.created += len(objects)
+
+    def after_batch(self, objects):
+        pass
+
+    def finish(self):
+        """Обновляет производные данные, которые вставка не трогает"""
+
+    def run(self, rows):
+        rows = iter(rows)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch)
+        finally:
+            # Пачки до прерывания уже сохранены и должны попасть в индекс
+            if self.created and not self.dry_run:
+                self.finish()
+        return self.created
+
+
+class PostImporter(BaseImporter):
+    model = Post
+    fields = ('title', 'text', 'pub_date', 'is_published', 'image',
+              'created_at')
+    references = {
+        'author': (User, User.USERNAME_FIELD),
+        'category': (Category, 'slug'),
+        'location': (Location, 'name'),
+    }
+    reference_fields = {'category': ('is_published',)}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.touched = {'categories': set(), 'locations': set(),
+                        'authors': set()}
+
+    def build(self, row):
+        post = super().build(row)
+        category = self.reference_values['category'].get(post.category_id)
+        # Видимость известна до вставки, поэтому флаг учёта пишется сразу;
+        # отложенные посты учтёт проверка наступивших публикаций
+        post.is_counted = bool(
+            post.is_published and post.pub_date <= self.now
+            and category and category['is_published']
+        )
+        return post
+
+    def after_batch(self, objects):
+        for post in objects:
+            self.touched['categories'].add(post.category_id)
+            self.touched['locations'].add(post.location_id)
+            self.touched['authors'].add(post.author_id)
+
+    def finish(self):
+        # Счётчики раньше индекса: посты уже сохранены, и ошибка
+        # индексации не должна оставить их неучтёнными
+        recount_published(**{name: pks - {None}
+                             for name, pks in self.touched.items()})
+        bump_version(*FEED_PAGES)
+        bump_version(*POST_COUNTS)
+        reset_publication_state()
+        # В диапазон попадают и посты, созданные на сайте во время
+        # импорта; их строки индекса заменяются теми же данными
+        get_search_backend().index_posts(
+            Post.objects.filter(pk__gt=self.last_pk)
+        )
+
+
+class CommentImporter(BaseImporter):
+    model = Comment
+    fields = ('text', 'created_at')
+    references = {
+        'post': (Post, 'pk'),
+        'author': (User, User.USERNAME_FIELD),
+    }
+
+    def after_batch(self, objects):
+        post_ids = {comment.post_id for comment in objects}
+        recount_comment_counts(Post.objects.filter(pk__in=post_ids))
+        recount_author_comments({comment.author_id for comment in objects})
+        for post_id in post_ids:
+            bump_version('post', post_id)
+
+    def finish(self):
+        bump_version(*FEED_PAGES)
+        get_search_backend().index_comments(
+            Comment.objects.filter(pk__gt=self.last_pk)
+        )
+
+
+IMPORTERS = {
+    'post': PostImporter,
+    'comment': CommentImporter,
+}
@@ -0,0 +1,107 @@
+import logging
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .constants import JOB_RETRY_DELAY, JOB_STALE_TIMEOUT
+from .models import Job
+
+logger = logging.getLogger('blog.jobs')
+
+
+def task_path(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, **payload):
+    """Ставит вызов ``func(**payload)`` в очередь фоновых задач"""
+    return Job.objects.create(task=task_path(func), payload=payload)
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задачи, оставшиеся от упавших обработчиков"""
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=JOB_STALE_TIMEOUT)
+    ).update(status=Job.Status.PENDING, updated_at=timezone.now())
+
+
+def claim_jobs(limit):
+    """Захватывает задачи условным UPDATE, безопасно для нескольких воркеров"""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.Status.PENDING,
+        run_after__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        if Job.objects.filter(pk=pk, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=now
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def execute_task(task, payload):
+    """Выполняет задачу; возвращает текст ошибки или пустую строку"""
+    try:
+        import_string(task)(**payload)
+    except Exception:
+        return traceback.format_exc()
+    return ''
+
+
+def execute_task_in_worker(task, payload):
+    try:
+        return execute_task(task, payload)
+    finally:
+        connections.close_all()
+
+
+def finish_job(job, error):
+    job.last_error = error
+    if not error:
+        job.status = Job.Status.DONE
+    elif job.attempts >= job.max_attempts:
+        job.status = Job.Status.FAILED
+        logger.error('Job %s failed: %s', job, error)
+    else:
+        job.status = Job.Status.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+        logger.warning('Job %s will be retried at %s', job, job.run_after)
+    job.save(update_fields=('status', 'run_after', 'last_error',
+                            'updated_at'))
+    return job.status
+
+
+def run_pending_jobs(limit=100, workers=1, pool='thread'):
+    """Выполняет готовые к запуску задачи; возвращает их статусы
+
+    Обработчики пула только выполняют задачи, а статусы записывает
+    вызывающий поток.
+    """
+    requeue_stale_jobs()
+    jobs = list(Job.objects.filter(pk__in=claim_jobs(limit)))
+    if not jobs:
+        return []
+    tasks = ([job.task for job in jobs], [job.payload for job in jobs])
+    if workers <= 1:
+        errors = map(execute_task, *tasks)
+        return [finish_job(job, error) for job, error in zip(jobs, errors)]
+    if pool == 'process':
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    with executor:
+        errors = list(executor.map(execute_task_in_worker, *tasks))
+    return [finish_job(job, error) for job, error in zip(jobs, errors)]
@@ -0,0 +1,116 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from blog.bench import (ROUTES, TRANSPORTS, BenchmarkError, compare,
+                        database_profile, isolated_database, run_benchmark)
+from blog.seeding import SyntheticData, finish_seeding
+
+COLUMNS = ('requests', 'p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries',
+           'peak_rss_kb')
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон страниц блога на временной базе '
+            'с синтетическими данными')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode', choices=sorted(TRANSPORTS), default='client',
+            help='Тестовый клиент Django, локальный WSGI-сервер '
+                 'или ASGI-приложение в цикле событий.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Сколько запросов выполнять одновременно (wsgi и asgi).'
+        )
+        parser.add_argument(
+            '--async-views', action='store_true',
+            help='Обслуживать страницы для чтения асинхронными видами.'
+        )
+        parser.add_argument(
+            '--conn-max-age', type=int,
+            help='Время жизни соединения с базой в секундах, 0 — '
+                 'закрывать после каждого запроса.'
+        )
+        parser.add_argument(
+            '--pool-size', type=int,
+            help='Размер пула соединений blog.backends, 0 — без пула.'
+        )
+        parser.add_argument(
+            '--routes', nargs='+', choices=[route.name for route in ROUTES],
+            help='Какие маршруты прогонять; по умолчанию все.'
+        )
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Замеряемых запросов на маршрут.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Прогревочных запросов на маршрут.')
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments-per-post', type=float, default=3)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора данных.')
+        parser.add_argument('--output',
+                            help='Сохранить отчёт в JSON-файл.')
+        parser.add_argument(
+            '--compare', dest='baseline',
+            help='JSON-отчёт, с которым сравнить результаты.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базового отчёта.'
+        )
+
+    def handle(self, *args, mode, concurrency, async_views, conn_max_age,
+               pool_size, routes, requests, warmup, users, categories,
+               locations, posts, comments_per_post, seed, output, baseline,
+               threshold, **options):
+        if baseline:
+            with open(baseline, encoding='utf-8') as stream:
+                baseline = json.load(stream)
+        # Отладочная панель и построчный лог запросов искажают замеры
+        query_logger = logging.getLogger('blog.queries')
+        level = query_logger.level
+        query_logger.setLevel(logging.ERROR)
+        with isolated_database(), override_settings(
+            DEBUG=False, BLOG_QUERY_COUNT_HEADERS=True, ALLOWED_HOSTS=['*']
+        ):
+            data = SyntheticData(seed)
+            data.posts(posts, data.users(users), data.categories(categories),
+                       data.locations(locations), comments_per_post)
+            finish_seeding(recount=False)
+            try:
+                with database_profile(conn_max_age, pool_size):
+                    report = run_benchmark(mode, routes, requests, warmup,
+                                           concurrency, async_views)
+            except BenchmarkError as error:
+                raise CommandError(error)
+            finally:
+                query_logger.setLevel(level)
+        report['dataset'] = {
+            'users': users, 'categories': categories,
+            'locations': locations, 'posts': posts,
+            'comments_per_post': comments_per_post, 'seed': seed,
+        }
+
+        self.stdout.write(' '.join(
+            [f'{"route":<16}'] + [f'{column:>12}' for column in COLUMNS]
+        ))
+        for name, result in report['routes'].items():
+            self.stdout.write(' '.join(
+                [f'{name:<16}']
+                + [f'{str(result[column]):>12}' for column in COLUMNS]
+            ))
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
+        if baseline:
+            regressions = compare(report, baseline, threshold)
+            if regressions:
+                raise CommandError('Регрессии производительности:\n'
+                                   + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Регрессий не найдено'))
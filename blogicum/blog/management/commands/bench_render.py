@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.bench import (TEMPLATE_LOADERS, isolated_database,
+                        run_render_benchmark)
+from blog.seeding import SyntheticData, finish_seeding
+
+COLUMNS = ('renders', 'p50_ms', 'p95_ms')
+
+
+class Command(BaseCommand):
+    help = ('Время рендера ленты без кэша шаблонов, с кэширующим '
+            'загрузчиком и со встроенными подключениями')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loaders', nargs='+', choices=list(TEMPLATE_LOADERS),
+            default=list(TEMPLATE_LOADERS),
+            help='Какие наборы загрузчиков сравнивать.'
+        )
+        parser.add_argument('--renders', type=int, default=200,
+                            help='Замеряемых рендеров на набор.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Прогревочных рендеров на набор.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора данных.')
+        parser.add_argument('--output',
+                            help='Сохранить отчёт в JSON-файл.')
+
+    def handle(self, *args, loaders, renders, warmup, seed, output,
+               **options):
+        with isolated_database():
+            data = SyntheticData(seed)
+            data.posts(30, data.users(3), data.categories(2),
+                       data.locations(2), 0)
+            finish_seeding(recount=False)
+            report = run_render_benchmark(loaders, renders, warmup)
+        self.stdout.write(' '.join(
+            [f'{"loaders":<10}'] + [f'{column:>10}' for column in COLUMNS]
+        ))
+        for name, result in report['loaders'].items():
+            self.stdout.write(' '.join(
+                [f'{name:<10}']
+                + [f'{str(result[column]):>10}' for column in COLUMNS]
+            ))
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
@@ -0,0 +1,44 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.startup import DEFAULT_PATH, run_startup_benchmark
+
+COLUMNS = ('setup_ms', 'first_request_ms', 'apps', 'middleware', 'modules')
+
+
+class Command(BaseCommand):
+    help = ('Время django.setup() и первого запроса для профилей '
+            'настроек, каждый замер в новом процессе')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', choices=settings.PROFILES,
+            default=list(settings.PROFILES),
+            help='Какие профили BLOGICUM_PROFILE сравнивать.'
+        )
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Запусков на профиль.')
+        parser.add_argument('--path', default=DEFAULT_PATH,
+                            help='Адрес первого запроса.')
+        parser.add_argument('--output',
+                            help='Сохранить отчёт в JSON-файл.')
+
+    def handle(self, *args, profiles, repeat, path, output, **options):
+        try:
+            report = run_startup_benchmark(profiles, repeat, path)
+        except subprocess.CalledProcessError as error:
+            raise CommandError(error.stderr.decode(errors='replace'))
+        self.stdout.write(' '.join(
+            [f'{"profile":<8}'] + [f'{column:>17}' for column in COLUMNS]
+        ))
+        for profile, result in report.items():
+            self.stdout.write(' '.join(
+                [f'{profile:<8}']
+                + [f'{str(result[column]):>17}' for column in COLUMNS]
+            ))
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
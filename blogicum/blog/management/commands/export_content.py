@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.export import (EXPORT_MODELS, FORMATS, ExportError, check_filters,
+                         stream_export)
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает категории, местоположения, посты и '
+            'комментарии в NDJSON или JSON формата dumpdata')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='output_format',
+                            choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument(
+            '--models', nargs='+', choices=list(EXPORT_MODELS),
+            help='Какие модели выгружать; по умолчанию все.'
+        )
+        parser.add_argument('--from', dest='date_from',
+                            help='Не раньше даты (YYYY-MM-DD[THH:MM]).')
+        parser.add_argument('--to', dest='date_to',
+                            help='Не позже даты (YYYY-MM-DD[THH:MM]).')
+        parser.add_argument(
+            '--category',
+            help='Slug категории; местоположения при этом не выгружаются.'
+        )
+        parser.add_argument(
+            '--author',
+            help='Имя автора; категории и местоположения не выгружаются.'
+        )
+        parser.add_argument(
+            '--after',
+            help='Продолжить после записи, например post:1500.'
+        )
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE,
+                            help='Сколько строк читать из базы за раз.')
+        parser.add_argument('--output',
+                            help='Файл для выгрузки; по умолчанию stdout.')
+
+    def handle(self, *args, output_format, output, **options):
+        filters = {name: options[name] for name in (
+            'models', 'date_from', 'date_to', 'category', 'author', 'after'
+        )}
+        try:
+            check_filters(**filters)
+        except ExportError as error:
+            raise CommandError(error)
+        chunks = stream_export(output_format,
+                               chunk_size=options['chunk_size'], **filters)
+        if not output:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(output, 'w', encoding='utf-8') as stream:
+            stream.writelines(chunks)
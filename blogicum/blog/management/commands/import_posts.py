@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importing import IMPORTERS, ImportAborted, read_rows
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты или комментарии из NDJSON или CSV '
+            'пачками, с проверкой строк и отчётом об ошибках')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с данными для импорта.')
+        parser.add_argument('--model', choices=sorted(IMPORTERS),
+                            default='post')
+        parser.add_argument(
+            '--format', dest='input_format', choices=('ndjson', 'csv'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Строк в одной пачке и транзакции.')
+        parser.add_argument(
+            '--max-errors', type=int, default=100,
+            help='Прервать импорт, если отклонено больше строк.'
+        )
+        parser.add_argument(
+            '--errors', dest='errors_path',
+            help='Записать отклонённые строки с причинами в NDJSON-файл.'
+        )
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только проверить строки, не сохраняя.')
+
+    def handle(self, *args, path, model, input_format, batch_size,
+               max_errors, errors_path, dry_run, **options):
+        input_format = input_format or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        importer = IMPORTERS[model](batch_size, max_errors, dry_run)
+        aborted = None
+        try:
+            with open(path, encoding='utf-8', newline='') as stream:
+                importer.run(read_rows(stream, input_format))
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        except ImportAborted as error:
+            aborted = error
+
+        for number, messages in importer.errors:
+            details = '; '.join(f'{field}: {" ".join(errors)}'
+                                for field, errors in messages.items())
+            self.stderr.write(f'Строка {number}: {details}')
+        if errors_path:
+            with open(errors_path, 'w', encoding='utf-8') as stream:
+                for number, messages in importer.errors:
+                    stream.write(json.dumps(
+                        {'line': number, 'errors': messages},
+                        ensure_ascii=False
+                    ) + '\n')
+        action = 'Проверено' if dry_run else 'Импортировано'
+        summary = (f'{action}: {importer.created}, '
+                   f'отклонено: {len(importer.errors)}')
+        if aborted:
+            raise CommandError(f'{aborted}. {summary}')
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import FEED_PAGES, bump_version
+from blog.models import Post
+from blog.utils import recount_comment_counts, stale_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count и исправляет расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество постов, обрабатываемых в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        repaired = []
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                stale = list(stale_comment_counts(Post.objects.filter(
+                    pk__gt=start, pk__lte=start + batch_size
+                )).values_list('pk', flat=True))
+                if stale:
+                    recount_comment_counts(Post.objects.filter(pk__in=stale))
+            repaired += stale
+        # Карточки и страницы с неверным числом комментариев устарели
+        for pk in repaired:
+            bump_version('post', pk)
+        if repaired:
+            bump_version(*FEED_PAGES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {len(repaired)}'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import FEED_PAGES, POST_COUNTS, bump_version
+from blog.counters import recount_counters
+from blog.publication import reset_publication_state
+
+
+class Command(BaseCommand):
+    help = ('Сверяет счётчики опубликованных постов и комментариев '
+            'категорий, мест и авторов с данными и исправляет расхождения')
+
+    def handle(self, *args, **options):
+        repaired = recount_counters()
+        if any(repaired.values()):
+            # Числа постов на страницах и флаги учёта изменились в обход
+            # сигналов
+            bump_version(*FEED_PAGES)
+            bump_version(*POST_COUNTS)
+            reset_publication_state()
+        self.stdout.write(
+            f"Исправлено: постов {repaired['post']}, категорий "
+            f"{repaired['category']}, мест {repaired['location']}, "
+            f"авторов {repaired['author']}"
+        )
+        self.stdout.write(self.style.SUCCESS('Готово'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Обработчик очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Количество параллельных обработчиков.'
+        )
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+            help='Выполнять задачи в потоках или в процессах.'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=100,
+            help='Сколько задач захватывать за один проход.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь один раз и завершиться.'
+        )
+
+    def handle(self, *args, workers, pool, batch, sleep, once, **options):
+        while True:
+            statuses = run_pending_jobs(batch, workers, pool)
+            if statuses:
+                self.stdout.write(
+                    f'Обработано задач: {len(statuses)}, '
+                    f'с ошибкой: {statuses.count("failed")}'
+                )
+            if once:
+                return
+            if not statuses:
+                time.sleep(sleep)
@@ -0,0 +1,97 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Location
+from blog.seeding import SyntheticData, finish_seeding, load_fixture
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Быстро заполняет базу: потоково загружает JSON-фикстуры '
+            'и генерирует синтетические данные для нагрузочных тестов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='*',
+            help='JSON-фикстуры в формате dumpdata, например db.json.'
+        )
+        parser.add_argument('--users', type=int, default=0,
+                            help='Сколько пользователей создать.')
+        parser.add_argument('--categories', type=int, default=0,
+                            help='Сколько категорий создать.')
+        parser.add_argument('--locations', type=int, default=0,
+                            help='Сколько местоположений создать.')
+        parser.add_argument('--posts', type=int, default=0,
+                            help='Сколько постов создать.')
+        parser.add_argument(
+            '--comments-per-post', type=float, default=0,
+            help='Среднее число комментариев к синтетическому посту.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество объектов в одной вставке и транзакции.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора случайных чисел для воспроизводимости.'
+        )
+        parser.add_argument(
+            '--password', default=None,
+            help='Пароль синтетических пользователей; по умолчанию вход '
+                 'для них отключён.'
+        )
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help='Не перестраивать поисковый индекс после загрузки.'
+        )
+
+    def report(self, started, message):
+        self.stdout.write(f'{message} за {time.monotonic() - started:.1f} с')
+
+    def handle(self, *args, fixtures, users, categories, locations, posts,
+               comments_per_post, batch_size, seed, password, no_index,
+               **options):
+        for path in fixtures:
+            started = time.monotonic()
+            try:
+                with open(path, encoding='utf-8') as stream:
+                    counts = load_fixture(stream, batch_size)
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+            loaded = ', '.join(f'{label}: {count}'
+                               for label, count in counts.items())
+            self.report(started, f'{path} загружен ({loaded})')
+
+        if users or categories or locations or posts:
+            started = time.monotonic()
+            data = SyntheticData(seed, batch_size, password)
+            user_ids = (data.users(users) if users else list(
+                User.objects.values_list('pk', flat=True)
+            ))
+            category_ids = (data.categories(categories) if categories
+                            else list(Category.objects.values_list(
+                                'pk', flat=True)))
+            location_ids = (data.locations(locations) if locations
+                            else list(Location.objects.values_list(
+                                'pk', flat=True)))
+            if posts and not user_ids:
+                raise CommandError('Для постов нужен хотя бы один '
+                                   'пользователь: укажите --users.')
+            created_posts, created_comments = data.posts(
+                posts, user_ids, category_ids, location_ids,
+                comments_per_post
+            ) if posts else (0, 0)
+            self.report(
+                started,
+                f'Создано пользователей: {users}, категорий: {categories}, '
+                f'местоположений: {locations}, постов: {created_posts}, '
+                f'комментариев: {created_comments}'
+            )
+
+        started = time.monotonic()
+        finish_seeding(recount=bool(fixtures), rebuild_index=not no_index)
+        self.report(started, 'Счётчики и поисковый индекс обновлены')
+        self.stdout.write(self.style.SUCCESS('Готово'))
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from .queries import record_queries
+from .routers import choose_replica, current_replica
+
+logger = logging.getLogger('blog.queries')
+
+
+class QueryCountMiddleware:
+    """Учёт SQL-запросов на каждый запрос к сайту
+
+    В лог пишется структурированная запись, а при включённой настройке
+    BLOG_QUERY_COUNT_HEADERS результаты попадают в заголовки ответа.
+    Слой работает и в асинхронной цепочке, чтобы под ASGI не переводить
+    асинхронные виды в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django 3.2 узнаёт асинхронный слой, как и в MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        with record_queries() as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        stats = recorder.as_dict()
+        if settings.BLOG_QUERY_COUNT_HEADERS:
+            response['X-Query-Count'] = stats['query_count']
+            response['X-Query-Time'] = f"{stats['query_time_ms']:.3f}ms"
+            response['X-Query-Duplicates'] = stats['duplicate_queries']
+            response['X-Query-Similar'] = stats['similar_queries']
+        level = logging.WARNING if recorder.duplicates else logging.INFO
+        logger.log(
+            level,
+            '%s %s: %s queries in %sms, %s duplicates',
+            request.method, request.path, stats['query_count'],
+            stats['query_time_ms'], stats['duplicate_queries'],
+            extra={'method': request.method, 'path': request.path,
+                   'status': response.status_code, **stats},
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """Чтение с реплик для страниц с replica_reads
+
+    После успешного изменяющего запроса ставится cookie, и следующие
+    BLOG_PRIMARY_PIN_SECONDS секунд все чтения пользователя идут в
+    основную базу: так он сразу видит свой пост или комментарий, даже
+    если реплика отстаёт.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (request.method in ('GET', 'HEAD')
+                and getattr(view_class, 'replica_reads', False)
+                and settings.BLOG_PRIMARY_COOKIE not in request.COOKIES):
+            current_replica.set(choose_replica())
+
+    def process_response(self, request, response):
+        # В асинхронном режиме process_view работает в другом контексте,
+        # поэтому значение сбрасывается присваиванием, а не reset()
+        current_replica.set(None)
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+                and response.status_code < 400):
+            response.set_cookie(
+                settings.BLOG_PRIMARY_COOKIE, '1',
+                max_age=settings.BLOG_PRIMARY_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+TOKENIZER = "tokenize = 'unicode61 remove_diacritics 2'"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_search '
+        f'USING fts5(title, text, {TOKENIZER})'
+    )
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_comment_search '
+        f'USING fts5(text, post_id UNINDEXED, {TOKENIZER})'
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_post_search (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_comment_search (rowid, text, post_id) '
+        'SELECT id, text, post_id FROM blog_comment'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+    schema_editor.execute('DROP TABLE IF EXISTS blog_comment_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
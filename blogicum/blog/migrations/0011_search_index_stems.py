@@ -0,0 +1,62 @@
+from django.db import migrations
+
+from blog.search import SQLiteFTSBackend, comment_index_row, post_index_row
+
+TOKENIZER = "tokenize = 'unicode61 remove_diacritics 2'"
+
+
+def create_tables(schema_editor, post_columns, comment_columns):
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+    schema_editor.execute('DROP TABLE IF EXISTS blog_comment_search')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_search '
+        f'USING fts5({post_columns}, {TOKENIZER})'
+    )
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_comment_search '
+        f'USING fts5({comment_columns}, {TOKENIZER})'
+    )
+
+
+def index_stems(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    create_tables(schema_editor, 'title, text, boost UNINDEXED',
+                  'text, post_id UNINDEXED, boost UNINDEXED')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    posts = Post.objects.values_list('pk', 'title', 'text', 'pub_date')
+    comments = Comment.objects.values_list(
+        'pk', 'text', 'post_id', 'created_at'
+    )
+    with schema_editor.connection.cursor() as cursor:
+        SQLiteFTSBackend().fill(
+            cursor,
+            (post_index_row(*row) for row in posts.iterator()),
+            (comment_index_row(*row) for row in comments.iterator()),
+        )
+
+
+def index_words(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    create_tables(schema_editor, 'title, text', 'text, post_id UNINDEXED')
+    schema_editor.execute(
+        'INSERT INTO blog_post_search (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_comment_search (rowid, text, post_id) '
+        'SELECT id, text, post_id FROM blog_comment'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_stems, index_words),
+    ]
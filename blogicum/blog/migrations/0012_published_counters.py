@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from blog.counters import recount_counters
+
+
+def fill_counters(apps, schema_editor):
+    recount_counters(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0011_search_index_stems'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('published_post_count', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Опубликовано постов'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Опубликовано постов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_counted',
+            field=models.BooleanField(default=False, editable=False, help_text='Пост входит в счётчики опубликованных постов.', verbose_name='Учтён в счётчиках'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_counted', False), ('is_published', True)), fields=['pub_date'], name='post_uncounted_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from blog.search import SQLiteFTSBackend
+
+
+def reindex_boosts(apps, schema_editor):
+    # Множитель свежести хранится в индексе и пересчитывается для новой
+    # длины периода
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    backend = SQLiteFTSBackend()
+    with schema_editor.connection.cursor() as cursor:
+        backend.fill(
+            cursor,
+            backend._post_rows(apps.get_model('blog', 'Post').objects.all()),
+            backend._comment_rows(
+                apps.get_model('blog', 'Comment').objects.all()
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_published_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_boosts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,16 @@
-from django.urls import reverse
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.urls import reverse
 
+from .constants import PAGE_CACHE_TIMEOUT
 from .forms import CommentForm, PostForm
 from .models import Comment, Post
+from .paginators import CachedCountPaginator, CursorPaginator
+from .publication import publication_epoch
+from .routers import on_primary
 
 
 class PostBaseModelMixin:
@@ -38,11 +46,109 @@ class UniqueUrlAtributMixin:
     pk_url_kwarg = 'post_id'
 
 
-class CommentDispatchMixin:
+class DispatchedObjectMixin:
+    """Объект, загруженный в dispatch, не запрашивается повторно"""
+
+    def get_object(self, queryset=None):
+        if getattr(self, 'object', None) is not None:
+            return self.object
+        return super().get_object(queryset)
+
+
+class CommentDispatchMixin(DispatchedObjectMixin):
     """Проверка на авторство комментария"""
 
     def dispatch(self, request, *args, **kwargs):
         self.object = self.get_object()
-        if self.object.author != request.user:
+        if self.object.author_id != request.user.id:
             raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
+
+
+class CursorPaginationMixin:
+    """Постраничный вывод по курсору (pub_date, id) вместо номера страницы"""
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountMixin:
+    """Число постов для номеров страниц берётся из кэша ленты"""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_key(self):
+        """Имя ленты, для которой кэшируется число постов"""
+        return None
+
+    def get_post_count(self):
+        """Число постов из поддерживаемого счётчика, если он есть"""
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        paginator = super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_key=self.get_count_key(), **kwargs
+        )
+        count = self.get_post_count()
+        if count is not None:
+            paginator.count = count
+        return paginator
+
+
+class ReplicaReadMixin:
+    """Страница только читает данные, и её GET может обслужить реплика"""
+
+    replica_reads = True
+
+
+class AnonymousPageCacheMixin:
+    """Кэширование страницы целиком для анонимных пользователей
+
+    Ключ включает эпоху публикации, поэтому выход отложенного поста
+    сразу делает закэшированные страницы устаревшими. Страница, которая
+    попадёт в кэш, строится по основной базе: отстающая реплика иначе
+    сохранила бы старые данные под ключом текущей эпохи.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_cached_page(self):
+        """Ключ и сохранённый ответ; ключ None — страницу не кэшируем"""
+        if self.request.user.is_authenticated:
+            return None, None
+        key = (f'blog:page:{publication_epoch()}:'
+               f'{self.request.get_full_path()}')
+        return key, cache.get(key)
+
+    def cache_page(self, key, response):
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, self.page_cache_timeout
+                )
+            )
+
+    def get(self, request, *args, **kwargs):
+        key, response = self.get_cached_page()
+        if response is not None:
+            return response
+        if key is None:
+            return super().get(request, *args, **kwargs)
+        with on_primary():
+            response = super().get(request, *args, **kwargs)
+            self.cache_page(key, response)
+            # Шаблон читает строки страницы лениво, тоже с основной базы
+            response.render()
+        return response
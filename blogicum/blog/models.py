@@ -1,7 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
-from .constants import NUM_CHAR_OUTPUT, MAX_LENGTH
+from .constants import JOB_MAX_ATTEMPTS, NUM_CHAR_OUTPUT, MAX_LENGTH
 
 User = get_user_model()
 
@@ -35,6 +36,11 @@ class Category(PublishedModel):
         help_text=("Идентификатор страницы для URL; разрешены символы "
                    "латиницы, цифры, дефис и подчёркивание.")
     )
+    published_post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Опубликовано постов'
+    )
 
     class Meta:
         verbose_name = 'категория'
@@ -49,6 +55,11 @@ class Location(PublishedModel):
         max_length=MAX_LENGTH,
         verbose_name='Название места'
     )
+    published_post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Опубликовано постов'
+    )
 
     class Meta:
         verbose_name = 'местоположение'
@@ -97,10 +108,48 @@ class Post(PublishedModel):
         upload_to='posts_image',
         blank=True
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_counted = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Учтён в счётчиках',
+        help_text='Пост входит в счётчики опубликованных постов.'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_counted=False, is_published=True),
+                name='post_uncounted_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:NUM_CHAR_OUTPUT]
@@ -129,8 +178,101 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = ' Комментарии'
 
     def __str__(self):
         return self.text[:NUM_CHAR_OUTPUT]
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    published_post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Опубликовано постов'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Комментариев'
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнено'
+        FAILED = 'failed', 'Ошибка'
+
+    task = models.CharField(
+        max_length=MAX_LENGTH,
+        verbose_name='Задача'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Параметры'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=JOB_MAX_ATTEMPTS,
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Запустить после'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='job_status_run_after_idx'
+            ),
+        )
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
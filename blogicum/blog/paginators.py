@@ -0,0 +1,186 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import POST_COUNTS, get_versions
+from .constants import POST_COUNT_CACHE_TIMEOUT
+from .publication import next_go_live
+from .routers import on_primary
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """Страница, полученная по курсору"""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки без OFFSET и COUNT(*)
+
+    Все поля в ``ordering`` должны сортироваться в одном направлении,
+    последнее поле должно быть уникальным (обычно ``id``).
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        directions = {field.startswith('-') for field in ordering}
+        if len(directions) != 1:
+            raise ValueError(
+                'Cursor ordering fields must share one direction.'
+            )
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = directions.pop()
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for name in self.fields:
+            value = getattr(obj, name)
+            values.append(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+            )
+        payload = json.dumps({'d': direction, 'v': values})
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = payload['d'], payload['v']
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            opts = self.queryset.model._meta
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, UnicodeDecodeError, LookupError, TypeError,
+                ValueError, ValidationError) as error:
+            raise InvalidCursor('Invalid cursor.') from error
+        return direction, values
+
+    def _seek(self, values, forward):
+        lookup = 'lt' if self.descending == forward else 'gt'
+        conditions = []
+        for index, name in enumerate(self.fields):
+            equal = {
+                field: value
+                for field, value in zip(self.fields[:index], values[:index])
+            }
+            equal[f'{name}__{lookup}'] = values[index]
+            conditions.append(Q(**equal))
+        return reduce(or_, conditions)
+
+    def page(self, cursor=None):
+        ordering = self.ordering
+        queryset = self.queryset
+        direction = self.NEXT
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            forward = direction == self.NEXT
+            queryset = queryset.filter(self._seek(values, forward))
+            if not forward:
+                ordering = tuple(
+                    name if field.startswith('-') else f'-{name}'
+                    for field, name in zip(self.ordering, self.fields)
+                )
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], self.NEXT)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], self.PREVIOUS)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+def post_count_key(feed):
+    """Ключ числа постов ленты
+
+    Число меняется при правке постов и категорий и при выходе
+    отложенного поста, то есть когда сменяется ближайший момент
+    публикации.
+    """
+    version, = get_versions(POST_COUNTS)
+    go_live = next_go_live()
+    return (f'blog:count:{feed}:{version}:'
+            f'{go_live.timestamp() if go_live else ""}')
+
+
+class CachedCountPaginator(Paginator):
+    """Постраничный вывод по номеру с числом объектов из кэша
+
+    COUNT(*) выполняется один раз на ленту до следующего изменения
+    контента, а не на каждую страницу, и всегда в основной базе.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_key=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        key = post_count_key(self.count_key)
+        count = cache.get(key)
+        if count is None:
+            with on_primary():
+                count = super().count
+            cache.set(key, count, POST_COUNT_CACHE_TIMEOUT)
+        return count
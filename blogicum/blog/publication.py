@@ -0,0 +1,73 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import FEED_PAGES, get_versions
+from .constants import PUBLICATION_STATE_TIMEOUT
+from .counters import go_live
+from .models import Post
+from .routers import on_primary
+
+STATE_KEY = 'blog:publication:state'
+# Хранится без срока: состояние пересчитывается каждую минуту, а токен
+# меняется, только когда посты действительно выходят
+TOKEN_KEY = 'blog:publication:token'
+
+
+def reset_publication_state():
+    cache.delete(STATE_KEY)
+
+
+def get_publication_state():
+    """Граница публикации и момент ближайшей отложенной публикации
+
+    Пока не наступил ``next``, между ``cutoff`` и текущим моментом нет
+    ни одного поста, поэтому фильтр ``pub_date__lte=cutoff`` даёт тот же
+    результат, что и ``pub_date__lte=timezone.now()``. При сдвиге границы
+    вышедшие посты попадают в счётчики опубликованных.
+    """
+    now = timezone.now()
+    state = cache.get(STATE_KEY)
+    if state is None or (state['next'] is not None and state['next'] <= now):
+        # Отложенные посты ещё не учтены в счётчиках, поэтому один проход
+        # по индексу неучтённых находит и ближайшую публикацию, и уже
+        # вышедшие посты: у них дата не позже now. Состояние общее для
+        # всех читателей и читается с основной базы, а не с реплики
+        with on_primary():
+            pending = Post.objects.filter(
+                is_published=True, is_counted=False
+            ).filter(
+                Q(pub_date__gt=now) | Q(category__is_published=True)
+            ).order_by('pub_date').values_list('pub_date', flat=True)
+            next_moment = pending.first()
+            went_live = 0
+            if next_moment is not None and next_moment <= now:
+                went_live = go_live(now)
+                next_moment = pending.filter(pub_date__gt=now).first()
+        token = None if went_live else cache.get(TOKEN_KEY)
+        if token is None:
+            token = uuid4().hex
+            cache.set(TOKEN_KEY, token, None)
+        state = {
+            'cutoff': now,
+            'next': next_moment,
+            'token': token,
+        }
+        cache.set(STATE_KEY, state, PUBLICATION_STATE_TIMEOUT)
+    return state
+
+
+def publication_cutoff():
+    return get_publication_state()['cutoff']
+
+
+def next_go_live():
+    return get_publication_state()['next']
+
+
+def publication_epoch():
+    """Меняется, только когда выходит отложенный пост или меняется контент"""
+    content_version, = get_versions(FEED_PAGES)
+    return f"{get_publication_state()['token']}.{content_version}"
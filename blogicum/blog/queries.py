@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Активные счётчики с их базами; контекст передаётся и в потоки
+# sync_to_async, поэтому запросы асинхронного вида попадают в учёт
+# своего запроса, а не соседнего
+active_recorders = ContextVar('active_recorders', default=())
+
+
+class QueryRecorder:
+    """Счётчик SQL-запросов, их суммарного времени и повторов"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.executions = Counter()
+        # Запросы одного вида могут идти параллельно из пула потоков
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self.lock:
+                self.duration += time.perf_counter() - start
+                self.count += 1
+                self.statements[sql] += 1
+                self.executions[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Запросы, повторённые с теми же параметрами"""
+        return sum(n - 1 for n in self.executions.values() if n > 1)
+
+    @property
+    def similar(self):
+        """Запросы, повторённые с другими параметрами (признак N+1)"""
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def as_dict(self):
+        return {
+            'query_count': self.count,
+            'query_time_ms': round(self.duration * 1000, 3),
+            'duplicate_queries': self.duplicates,
+            'similar_queries': self.similar,
+        }
+
+
+def dispatch(execute, sql, params, many, context):
+    """Обёртка соединения, передающая запрос счётчикам контекста"""
+    alias = context['connection'].alias
+    for recorder, aliases in active_recorders.get():
+        if alias in aliases:
+            execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def watch(connection):
+    # В начало списка: execute_wrapper() снимает обёртки с конца
+    if dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, dispatch)
+
+
+@receiver(connection_created)
+def watch_new_connection(sender, connection, **kwargs):
+    """Соединения потоков sync_to_async и пула тоже ведут учёт"""
+    watch(connection)
+
+
+@contextmanager
+def record_queries(using=None):
+    """Считает запросы в текущем контексте, в том числе асинхронном"""
+    recorder = QueryRecorder()
+    aliases = {using} if using else set(connections)
+    for alias in aliases:
+        watch(connections[alias])
+    token = active_recorders.set(
+        active_recorders.get() + ((recorder, aliases),)
+    )
+    try:
+        yield recorder
+    finally:
+        active_recorders.reset(token)
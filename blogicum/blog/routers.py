@@ -0,0 +1,47 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, с которой читает текущий запрос; None — основная база
+current_replica = ContextVar('blog_replica', default=None)
+
+
+def choose_replica():
+    replicas = settings.BLOG_READ_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def read_from(alias):
+    token = current_replica.set(alias)
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+def on_primary():
+    """Чтение перед записью, которое не может ждать репликации"""
+    return read_from(None)
+
+
+class ReplicaRouter:
+    """Чтение с выбранной для запроса реплики, запись в основную базу
+
+    Объекты, прочитанные с реплики, тоже сохраняются в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.BLOG_READ_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
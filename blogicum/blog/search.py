@@ -0,0 +1,341 @@
+import re
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import snowballstemmer
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .constants import (SEARCH_COMMENT_WEIGHT, SEARCH_RECENCY_HALF_LIFE,
+                        SEARCH_RECENCY_MAX_HALF_LIVES, SEARCH_RESULTS_LIMIT,
+                        SEARCH_TITLE_WEIGHT)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_RE = re.compile('[а-я]')
+RECENCY_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+_stemmers = threading.local()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def _get_stemmer(language):
+    # Стеммеры snowballstemmer хранят состояние и не потокобезопасны
+    stemmer = getattr(_stemmers, language, None)
+    if stemmer is None:
+        stemmer = snowballstemmer.stemmer(language)
+        setattr(_stemmers, language, stemmer)
+    return stemmer
+
+
+@lru_cache(maxsize=50000)
+def stem(token):
+    language = 'russian' if CYRILLIC_RE.search(token) else 'english'
+    return _get_stemmer(language).stemWord(token)
+
+
+def analyze(text):
+    """Нормализованные основы слов текста"""
+    return [stem(token) for token in tokenize(text)]
+
+
+def analyzed(text):
+    return ' '.join(analyze(text))
+
+
+def recency_boost(moment):
+    """Множитель свежести, удваивающийся каждые SEARCH_RECENCY_HALF_LIFE
+
+    Зависит только от даты записи, поэтому вычисляется при индексации,
+    а порядок результатов не меняется со временем. Период в пять лет
+    даёт новому посту преимущество около 15% за год: свежесть решает
+    при близкой релевантности, но не перевешивает bm25. Показатель степени
+    ограничен SEARCH_RECENCY_MAX_HALF_LIVES в обе стороны: для дат
+    далеко в будущем или прошлом множитель не переполняется и не
+    обращается в ноль, при котором пропал бы порядок по bm25.
+    """
+    half_lives = ((moment - RECENCY_EPOCH).total_seconds()
+                  / SEARCH_RECENCY_HALF_LIFE)
+    return 2.0 ** max(-SEARCH_RECENCY_MAX_HALF_LIVES,
+                      min(half_lives, SEARCH_RECENCY_MAX_HALF_LIVES))
+
+
+def post_index_row(pk, title, text, pub_date):
+    return (pk, analyzed(title), analyzed(text), recency_boost(pub_date))
+
+
+def comment_index_row(pk, text, post_id, created_at):
+    return (pk, analyzed(text), post_id, recency_boost(created_at))
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового индекса постов и комментариев"""
+
+    def index_post(self, post):
+        raise NotImplementedError
+
+    def index_comment(self, comment):
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        raise NotImplementedError
+
+    def remove_comment(self, comment_id):
+        raise NotImplementedError
+
+    def index_posts(self, queryset):
+        """Индексирует посты, добавленные в обход сигналов"""
+        for post in queryset.iterator():
+            self.index_post(post)
+
+    def index_comments(self, queryset):
+        for comment in queryset.iterator():
+            self.index_comment(comment)
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT):
+        """Id постов по убыванию релевантности с учётом комментариев"""
+        raise NotImplementedError
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        raise NotImplementedError
+
+    def filter_posts(self, queryset, query):
+        """Все найденные посты queryset, без ранжирования и лимита
+
+        Условие вычисляется в SQL, поэтому подходит для списков с
+        постраничной разбивкой, например в админке.
+        """
+        raise NotImplementedError
+
+    def filter_comments(self, queryset, query):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Поиск через LIKE для баз без полнотекстового индекса"""
+
+    def index_post(self, post):
+        pass
+
+    def index_comment(self, comment):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def index_posts(self, queryset):
+        pass
+
+    def index_comments(self, queryset):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def _filter(self, fields, query):
+        condition = Q()
+        for token in analyze(query):
+            token_condition = Q()
+            for field in fields:
+                token_condition |= Q(**{f'{field}__icontains': token})
+            condition &= token_condition
+        return condition
+
+    def filter_posts(self, queryset, query):
+        if not tokenize(query):
+            return queryset.none()
+        return queryset.filter(self._filter(('title', 'text'), query))
+
+    def filter_comments(self, queryset, query):
+        if not tokenize(query):
+            return queryset.none()
+        return queryset.filter(self._filter(('text',), query))
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT):
+        from .models import Post
+
+        return list(self.filter_posts(Post.objects.all(), query).order_by(
+            '-pub_date'
+        ).values_list('pk', flat=True)[:limit])
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        from .models import Comment
+
+        return list(self.filter_comments(
+            Comment.objects.all(), query
+        ).order_by('-created_at').values_list('pk', flat=True)[:limit])
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Полнотекстовый индекс на виртуальных таблицах SQLite FTS5
+
+    rowid строк индекса совпадает с id поста или комментария, поэтому
+    обновление и удаление записи не требуют просмотра таблицы. В индекс
+    пишутся основы слов и множитель свежести, так что при поиске остаётся
+    только умножить bm25 на готовое число.
+    """
+
+    post_table = 'blog_post_search'
+    comment_table = 'blog_comment_search'
+    post_columns = ('title', 'text', 'boost')
+    comment_columns = ('text', 'post_id', 'boost')
+    batch_size = 1000
+
+    def build_query(self, query):
+        return ' '.join(f'"{token}"*' for token in analyze(query))
+
+    def _insert_sql(self, table, columns, verb='INSERT'):
+        placeholders = ', '.join(['%s'] * (len(columns) + 1))
+        return (f'{verb} INTO {table} (rowid, {", ".join(columns)}) '
+                f'VALUES ({placeholders})')
+
+    def _replace(self, table, columns, row):
+        # FTS5 разрешает конфликт по rowid заменой строки
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self._insert_sql(table, columns, 'INSERT OR REPLACE'), row
+            )
+
+    def _delete(self, table, row_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [row_id])
+
+    def index_post(self, post):
+        self._replace(self.post_table, self.post_columns, post_index_row(
+            post.pk, post.title, post.text, post.pub_date
+        ))
+
+    def index_comment(self, comment):
+        self._replace(self.comment_table, self.comment_columns,
+                      comment_index_row(comment.pk, comment.text,
+                                        comment.post_id, comment.created_at))
+
+    def remove_post(self, post_id):
+        self._delete(self.post_table, post_id)
+
+    def remove_comment(self, comment_id):
+        self._delete(self.comment_table, comment_id)
+
+    def _match(self, sql, query, limit):
+        match = self.build_query(query)
+        if not match:
+            return []
+        params = [match] * sql.count('MATCH') + [limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT):
+        # bm25 отрицателен: чем меньше значение, тем выше релевантность
+        return self._match(
+            f'SELECT post_id FROM ('
+            f' SELECT rowid AS post_id,'
+            f' bm25({self.post_table}, {SEARCH_TITLE_WEIGHT}, 1.0) * boost'
+            f' AS score FROM {self.post_table}'
+            f' WHERE {self.post_table} MATCH %s'
+            f' UNION ALL'
+            f' SELECT post_id,'
+            f' bm25({self.comment_table}) * boost * {SEARCH_COMMENT_WEIGHT}'
+            f' AS score FROM {self.comment_table}'
+            f' WHERE {self.comment_table} MATCH %s'
+            f') GROUP BY post_id ORDER BY MIN(score) LIMIT %s',
+            query, limit
+        )
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        return self._match(
+            f'SELECT rowid FROM {self.comment_table}'
+            f' WHERE {self.comment_table} MATCH %s'
+            f' ORDER BY bm25({self.comment_table}) * boost LIMIT %s',
+            query, limit
+        )
+
+    def _matching(self, column, table, match):
+        return RawSQL(f'SELECT {column} FROM {table} WHERE {table} MATCH %s',
+                      [match])
+
+    def filter_posts(self, queryset, query):
+        match = self.build_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            Q(pk__in=self._matching('rowid', self.post_table, match))
+            | Q(pk__in=self._matching('post_id', self.comment_table, match))
+        )
+
+    def filter_comments(self, queryset, query):
+        match = self.build_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=self._matching('rowid', self.comment_table, match)
+        )
+
+    def fill(self, cursor, post_rows, comment_rows):
+        """Заполняет индекс пачками строк post_index_row/comment_index_row
+
+        Уже проиндексированные строки заменяются.
+        """
+        for table, columns, rows in (
+            (self.post_table, self.post_columns, post_rows),
+            (self.comment_table, self.comment_columns, comment_rows),
+        ):
+            sql = self._insert_sql(table, columns, 'INSERT OR REPLACE')
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+
+    def _post_rows(self, queryset):
+        for row in queryset.values_list(
+            'pk', 'title', 'text', 'pub_date'
+        ).iterator(chunk_size=self.batch_size):
+            yield post_index_row(*row)
+
+    def _comment_rows(self, queryset):
+        for row in queryset.values_list(
+            'pk', 'text', 'post_id', 'created_at'
+        ).iterator(chunk_size=self.batch_size):
+            yield comment_index_row(*row)
+
+    def index_posts(self, queryset):
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.fill(cursor, self._post_rows(queryset), ())
+
+    def index_comments(self, queryset):
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.fill(cursor, (), self._comment_rows(queryset))
+
+    def rebuild(self):
+        from .models import Comment, Post
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.post_table}')
+            cursor.execute(f'DELETE FROM {self.comment_table}')
+            self.fill(cursor, self._post_rows(Post.objects.all()),
+                      self._comment_rows(Comment.objects.all()))
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    return _load_backend(settings.BLOG_SEARCH_BACKEND)
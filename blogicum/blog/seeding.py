@@ -0,0 +1,268 @@
+import json
+import random
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+
+from .cache import FEED_PAGES, POST_COUNTS, bump_version
+from .counters import recount_counters
+from .models import Category, Comment, Location, Post
+from .publication import reset_publication_state
+from .search import get_search_backend
+from .utils import recount_comment_counts
+
+User = get_user_model()
+
+FIXTURE_CHUNK_SIZE = 64 * 1024
+TEXT_POOL_SIZE = 1000
+
+
+def iter_fixture(stream, chunk_size=FIXTURE_CHUNK_SIZE):
+    """Потоково разбирает JSON-массив фикстуры, не читая файл целиком"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    opened = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if not opened and position < len(buffer):
+            if buffer[position] != '[':
+                raise ValueError('Фикстура должна быть JSON-массивом')
+            opened = True
+            position += 1
+            continue
+        if opened and buffer[position:position + 1] == ']':
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+
+
+def bulk_insert(model, objects, batch_size, using=DEFAULT_DB_ALIAS):
+    """Вставляет объекты как есть, без сигналов и auto_now
+
+    Так же, как loaddata, пишет значения полей без pre_save, но одним
+    подготовленным INSERT через executemany, минуя компилятор запросов.
+    Строки, первичный ключ которых уже занят, пропускаются.
+    """
+    if not objects:
+        return
+    # Прокси django.db.connection ищет соединение при каждом обращении,
+    # поэтому для сотен тысяч значений берём его один раз
+    db = connections[using]
+    opts = model._meta
+    fields = [field for field in opts.concrete_fields
+              if not (field.primary_key and objects[0].pk is None)]
+    quote = db.ops.quote_name
+    sql = '{} {} ({}) VALUES ({}) {}'.format(
+        db.ops.insert_statement(ignore_conflicts=True),
+        quote(opts.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+        db.ops.ignore_conflicts_suffix_sql(ignore_conflicts=True),
+    )
+    with db.cursor() as cursor:
+        for start in range(0, len(objects), batch_size):
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(getattr(obj, field.attname), db)
+                 for field in fields]
+                for obj in objects[start:start + batch_size]
+            ])
+
+
+def _save_m2m(deserialized):
+    for item in deserialized:
+        for name, values in (item.m2m_data or {}).items():
+            if values:
+                getattr(item.object, name).add(*values)
+
+
+def load_fixture(stream, batch_size=5000):
+    """Загружает фикстуру пачками; возвращает число объектов по моделям"""
+    counts = {}
+    pending = []
+
+    def flush():
+        if not pending:
+            return
+        model = pending[0].object.__class__
+        bulk_insert(model, [item.object for item in pending], batch_size)
+        _save_m2m(pending)
+        pending.clear()
+
+    with transaction.atomic(), connection.constraint_checks_disabled():
+        for record in iter_fixture(stream):
+            item = next(Deserializer([record]))
+            model = item.object.__class__
+            if pending and (pending[0].object.__class__ is not model
+                            or len(pending) >= batch_size):
+                flush()
+            pending.append(item)
+            label = item.object._meta.label
+            counts[label] = counts.get(label, 0) + 1
+        flush()
+        loaded = [apps.get_model(label) for label in counts]
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in loaded]
+        )
+        _reset_sequences(loaded)
+    return counts
+
+
+def _reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def _next_pk(model):
+    last = model._base_manager.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    return (last or 0) + 1
+
+
+class SyntheticData:
+    """Генератор синтетических пользователей, постов и комментариев
+
+    Тексты берутся из заранее сгенерированного Faker пула, а первичные
+    ключи назначаются заранее, поэтому комментарии можно создавать сразу
+    после своей пачки постов без повторного чтения id из базы.
+    """
+
+    def __init__(self, seed=None, batch_size=5000, password=None):
+        from faker import Faker
+
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.password = make_password(password)
+        faker = Faker('ru_RU')
+        faker.seed_instance(seed)
+        self.titles = [faker.sentence(nb_words=4)[:-1]
+                       for _ in range(TEXT_POOL_SIZE)]
+        self.texts = [faker.paragraph(nb_sentences=5)
+                      for _ in range(TEXT_POOL_SIZE)]
+        self.comments = [faker.sentence(nb_words=10)
+                         for _ in range(TEXT_POOL_SIZE)]
+        self.places = [faker.city() for _ in range(TEXT_POOL_SIZE)]
+        self.first_names = [faker.first_name() for _ in range(100)]
+        self.last_names = [faker.last_name() for _ in range(100)]
+
+    def moment(self, days):
+        return self.now - timedelta(seconds=self.random.randint(
+            0, days * 24 * 60 * 60
+        ))
+
+    def _create(self, model, count, build):
+        first = _next_pk(model)
+        for start in range(first, first + count, self.batch_size):
+            stop = min(start + self.batch_size, first + count)
+            with transaction.atomic():
+                bulk_insert(model, [build(pk) for pk in range(start, stop)],
+                            self.batch_size)
+        return list(range(first, first + count))
+
+    def users(self, count):
+        return self._create(User, count, lambda pk: User(
+            pk=pk, username=f'seed_user_{pk}', password=self.password,
+            first_name=self.random.choice(self.first_names),
+            last_name=self.random.choice(self.last_names),
+            is_active=True, date_joined=self.moment(730),
+        ))
+
+    def categories(self, count):
+        return self._create(Category, count, lambda pk: Category(
+            pk=pk, title=self.random.choice(self.titles),
+            description=self.random.choice(self.texts),
+            slug=f'seed-{pk}', is_published=self.random.random() < 0.9,
+            created_at=self.moment(730),
+        ))
+
+    def locations(self, count):
+        return self._create(Location, count, lambda pk: Location(
+            pk=pk, name=self.random.choice(self.places),
+            is_published=self.random.random() < 0.9,
+            created_at=self.moment(730),
+        ))
+
+    def posts(self, count, authors, categories, locations,
+              comments_per_post=0, commenters=None):
+        """Создаёт посты вместе с комментариями; возвращает их количество"""
+        commenters = commenters or authors
+        next_post = _next_pk(Post)
+        next_comment = _next_pk(Comment)
+        total_comments = 0
+        for start in range(0, count, self.batch_size):
+            posts, comments = [], []
+            for pk in range(next_post, next_post + min(self.batch_size,
+                                                       count - start)):
+                if self.random.random() < 0.02:
+                    pub_date = self.now + timedelta(
+                        minutes=self.random.randint(1, 30 * 24 * 60)
+                    )
+                else:
+                    pub_date = self.moment(365)
+                comment_count = self.random.randint(
+                    0, int(2 * comments_per_post)
+                )
+                posts.append(Post(
+                    pk=pk, title=self.random.choice(self.titles),
+                    text=self.random.choice(self.texts), pub_date=pub_date,
+                    author_id=self.random.choice(authors),
+                    category_id=(self.random.choice(categories)
+                                 if categories else None),
+                    location_id=(self.random.choice(locations)
+                                 if locations and self.random.random() < 0.7
+                                 else None),
+                    is_published=self.random.random() < 0.95,
+                    created_at=min(pub_date, self.now),
+                    comment_count=comment_count,
+                ))
+                for _ in range(comment_count):
+                    comments.append(Comment(
+                        pk=next_comment, post_id=pk,
+                        text=self.random.choice(self.comments),
+                        author_id=self.random.choice(commenters),
+                        created_at=min(pub_date + timedelta(
+                            minutes=self.random.randint(1, 7 * 24 * 60)
+                        ), self.now),
+                    ))
+                    next_comment += 1
+            next_post += len(posts)
+            total_comments += len(comments)
+            with transaction.atomic():
+                bulk_insert(Post, posts, self.batch_size)
+                bulk_insert(Comment, comments, self.batch_size)
+        return count, total_comments
+
+
+def finish_seeding(recount=True, rebuild_index=True):
+    """Приводит в порядок производные данные после массовой вставки"""
+    _reset_sequences([User, Category, Location, Post, Comment])
+    if recount:
+        recount_comment_counts()
+    recount_counters()
+    if rebuild_index:
+        get_search_backend().rebuild()
+    bump_version(*FEED_PAGES)
+    bump_version(*POST_COUNTS)
+    reset_publication_state()
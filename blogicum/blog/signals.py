@@ -0,0 +1,195 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import FEED_PAGES, POST_COUNTS, bump_version
+from .counters import (apply_post_deltas, change_author_comments,
+                       sync_post_counters)
+from .models import AuthorStats, Category, Comment, Location, Post
+from .publication import reset_publication_state
+from .search import get_search_backend
+from .utils import change_comment_count
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._previous_post_id = instance._previous_author_id = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_post_id, instance._previous_author_id = (
+            Comment.objects.filter(pk=instance.pk).values_list(
+                'post_id', 'author_id'
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    previous_author_id = getattr(instance, '_previous_author_id', None)
+    if created:
+        change_author_comments(instance.author_id, 1)
+        change_comment_count(instance.post_id, 1)
+        bump_version('post', instance.post_id)
+        bump_version(*FEED_PAGES)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+        bump_version('post', previous_post_id)
+        bump_version('post', instance.post_id)
+        bump_version(*FEED_PAGES)
+    if previous_author_id and previous_author_id != instance.author_id:
+        change_author_comments(previous_author_id, -1)
+        change_author_comments(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+    change_author_comments(instance.author_id, -1)
+    bump_version('post', instance.post_id)
+    bump_version(*FEED_PAGES)
+
+
+@receiver(pre_save, sender=Post)
+def remember_counted_post(sender, instance, **kwargs):
+    # Флаг учёта ведут только счётчики: значение из формы или из давно
+    # загруженного объекта не должно перезаписать его в базе
+    row = None
+    if instance.pk and not instance._state.adding:
+        row = Post.objects.filter(pk=instance.pk).values_list(
+            'is_counted', 'category_id', 'location_id', 'author_id'
+        ).first()
+    instance.is_counted = bool(row and row[0])
+    instance._counted_refs = row[1:] if instance.is_counted else None
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, **kwargs):
+    previous = getattr(instance, '_counted_refs', None)
+    if previous is not None and previous != (
+        instance.category_id, instance.location_id, instance.author_id
+    ):
+        # Пост учтён в прежних категории, месте или у прежнего автора
+        apply_post_deltas([previous], -1)
+        Post.objects.filter(pk=instance.pk).update(is_counted=False)
+    sync_post_counters(Post.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    if instance.is_counted:
+        apply_post_deltas(
+            [(instance.category_id, instance.location_id,
+              instance.author_id)], -1
+        )
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+def remember_counted_state(sender, instance, **kwargs):
+    # Счётчик в загруженном объекте мог устареть, сохраняется значение
+    # из базы
+    instance._was_published, instance.published_post_count = None, 0
+    if instance.pk and not instance._state.adding:
+        instance._was_published, instance.published_post_count = (
+            sender.objects.filter(pk=instance.pk).values_list(
+                'is_published', 'published_post_count'
+            ).first() or (None, 0)
+        )
+
+
+@receiver(post_save, sender=Category)
+def count_category_posts(sender, instance, created, **kwargs):
+    was_published = getattr(instance, '_was_published', None)
+    if not created and was_published != instance.is_published:
+        sync_post_counters(Post.objects.filter(category_id=instance.pk))
+
+
+@receiver(post_delete, sender=Category)
+def uncount_category_posts(sender, instance, **kwargs):
+    # К этому моменту у постов категории уже category_id = NULL
+    sync_post_counters(
+        Post.objects.filter(is_counted=True, category__isnull=True)
+    )
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.bulk_create([AuthorStats(user=instance)],
+                                        ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    bump_version('post', instance.pk)
+    bump_version(*FEED_PAGES)
+    bump_version(*POST_COUNTS)
+    reset_publication_state()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    bump_version('category', instance.pk)
+    bump_version(*FEED_PAGES)
+    bump_version(*POST_COUNTS)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    bump_version('location', instance.pk)
+    bump_version(*FEED_PAGES)
+
+
+@receiver(pre_save, sender=User)
+def remember_feed_fields(sender, instance, update_fields=None, **kwargs):
+    # В лентах и API из пользователя видно только имя: вход на сайт
+    # (last_login) или смена пароля закэшированных страниц не меняют
+    instance._feed_fields_changed = False
+    if instance._state.adding or not instance.pk:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    instance._feed_fields_changed = User.objects.filter(
+        pk=instance.pk
+    ).exclude(username=instance.username).exists()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # Версия пользователя нужна карточкам и CachedModelBackend и меняется
+    # при любом сохранении
+    bump_version('user', instance.pk)
+    if getattr(instance, '_feed_fields_changed', True):
+        bump_version(*FEED_PAGES)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    bump_version('user', instance.pk)
+    bump_version(*FEED_PAGES)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    get_search_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    get_search_backend().remove_comment(instance.pk)
@@ -0,0 +1,72 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_PATH = '/pages/about/'
+
+
+def measure(path=DEFAULT_PATH):
+    """Время django.setup() и первого запроса в текущем процессе"""
+    started = time.perf_counter()
+    import django
+    django.setup()
+    setup = time.perf_counter() - started
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {'PATH_INFO': path, 'HTTP_HOST': settings.ALLOWED_HOSTS[0],
+               'REMOTE_ADDR': '127.0.0.1'}
+    setup_testing_defaults(environ)
+    status = []
+    started = time.perf_counter()
+    response = get_wsgi_application()(
+        environ, lambda code, headers: status.append(code)
+    )
+    b''.join(response)
+    response.close()
+    first_request = time.perf_counter() - started
+    return {
+        'setup_ms': round(setup * 1000, 3),
+        'first_request_ms': round(first_request * 1000, 3),
+        'status': int(status[0].split()[0]),
+        'apps': len(settings.INSTALLED_APPS),
+        'middleware': len(settings.MIDDLEWARE),
+        'modules': len(sys.modules),
+    }
+
+
+def run_startup_benchmark(profiles, repeat=5, path=DEFAULT_PATH):
+    """Медианы замеров measure() по repeat запускам на профиль
+
+    Каждый замер идёт в свежем интерпретаторе (python -m blog.startup):
+    django.setup() и первый запрос нельзя честно измерить в процессе,
+    где Django уже загружен.
+    """
+    results = {}
+    for profile in profiles:
+        env = {**os.environ, 'BLOGICUM_PROFILE': profile}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+        # Профиль prod без ключа не запускается; замеру годится любой
+        env.setdefault('BLOGICUM_SECRET_KEY', 'startup-benchmark')
+        samples = [json.loads(subprocess.run(
+            [sys.executable, '-m', 'blog.startup', path],
+            cwd=BASE_DIR, env=env, capture_output=True, check=True,
+        ).stdout) for _ in range(repeat)]
+        results[profile] = {
+            key: (statistics.median(sample[key] for sample in samples)
+                  if key.endswith('_ms') else samples[0][key])
+            for key in samples[0]
+        }
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(measure(*sys.argv[1:2])))
@@ -0,0 +1,55 @@
+from django import template
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.safestring import mark_safe
+
+from blog.cache import post_card_key
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Карточка поста из кэша; при промахе рендерится post_card.html
+
+    Карточка поста, прочитанного с реплики, не сохраняется: данные
+    могут отставать от версии в ключе.
+    """
+    key = post_card_key(post)
+    html = cache.get(key)
+    if html is None:
+        card = context.template.engine.get_template('includes/post_card.html')
+        with context.push(post=post):
+            html = card.render(context)
+        if post._state.db == DEFAULT_DB_ALIAS:
+            cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+@register.filter
+def image_srcset(post, image_format):
+    """Значение атрибута srcset для уменьшенных копий фото поста"""
+    storage = post._meta.get_field('image').storage
+    variants = (post.image_variants or {}).get(image_format, {})
+    return ', '.join(
+        f'{storage.url(name)} {width}w'
+        for width, name in sorted(variants.items(), key=lambda v: int(v[0]))
+    )
+
+
+@register.simple_tag
+def page_window(page, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, пропуски — многоточием"""
+    return page.paginator.get_elided_page_range(
+        page.number, on_each_side=on_each_side, on_ends=on_ends
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Ссылка на страницу списка с сохранением остальных GET-параметров"""
+    query = context['request'].GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    return f'?{query.urlencode()}'
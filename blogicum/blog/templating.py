@@ -0,0 +1,129 @@
+import os
+from fnmatch import fnmatch
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.base import DebugLexer, Origin, TokenType
+from django.template.loaders.base import Loader as BaseLoader
+
+# Подключения с такими тегами не встраиваются: блоки встроенного шаблона
+# смешались бы с блоками страницы
+NOT_INLINED_TAGS = ('extends', 'block')
+
+
+class InliningLoader(BaseLoader):
+    """Подставляет в шаблоны страниц исходники их {% include %}
+
+    Для шаблонов из BLOG_INLINE_TEMPLATE_PATTERNS подключения с именем в
+    кавычках заменяются текстом подключаемого шаблона, рекурсивно, так
+    что страница компилируется в один шаблон без поиска и разбора
+    подключений при рендере. Тело оборачивается в {% with %}: как и при
+    include, переменные, заданные внутри, не видны снаружи. Подключения
+    с only, с переменной вместо имени, а также шаблоны с extends и
+    block остаются обычными include. Имеет смысл вместе с кэширующим
+    загрузчиком, иначе подстановка повторяется на каждый запрос.
+    """
+
+    def __init__(self, engine, loaders, patterns=None):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+        self.patterns = (settings.BLOG_INLINE_TEMPLATE_PATTERNS
+                         if patterns is None else patterns)
+
+    def get_template_sources(self, template_name):
+        for loader in self.loaders:
+            for source in loader.get_template_sources(template_name):
+                origin = Origin(source.name, source.template_name, self)
+                origin.source = source
+                yield origin
+
+    def read(self, origin):
+        return origin.source.loader.get_contents(origin.source)
+
+    def get_contents(self, origin):
+        contents = self.read(origin)
+        if any(fnmatch(origin.template_name, pattern)
+               for pattern in self.patterns):
+            contents = self.inline(contents, {origin.template_name})
+        return contents
+
+    def find_contents(self, template_name):
+        for origin in self.get_template_sources(template_name):
+            try:
+                return self.read(origin)
+            except TemplateDoesNotExist:
+                continue
+        raise TemplateDoesNotExist(template_name)
+
+    def inline(self, source, seen):
+        parts = []
+        for token in DebugLexer(source).tokenize():
+            start, end = token.position
+            replacement = None
+            if (token.token_type == TokenType.BLOCK
+                    and token.contents.split()[0] == 'include'):
+                replacement = self.inline_include(token.split_contents(),
+                                                  seen)
+            parts.append(source[start:end] if replacement is None
+                         else replacement)
+        return ''.join(parts)
+
+    def inline_include(self, bits, seen):
+        name, options = bits[1], bits[2:]
+        if (len(name) < 2 or name[0] not in '"\'' or name[-1] != name[0]
+                or 'only' in options or 'as' in options):
+            return None
+        name = name[1:-1]
+        if name in seen:
+            return None
+        try:
+            included = self.find_contents(name)
+        except TemplateDoesNotExist:
+            # Ошибка появится при рендере, как и без подстановки
+            return None
+        if any(token.token_type == TokenType.BLOCK
+               and token.contents.split()[0] in NOT_INLINED_TAGS
+               for token in DebugLexer(included).tokenize()):
+            return None
+        assignments = ' '.join(options[1:]) or f'inlined_from="{name}"'
+        return (f'{{% with {assignments} %}}'
+                f'{self.inline(included, seen | {name})}'
+                f'{{% endwith %}}')
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """Имена всех шаблонов .html, которые видят загрузчики движка"""
+    names = set()
+    for directory in _loader_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            names.update(
+                os.path.relpath(os.path.join(root, name), directory).replace(
+                    os.sep, '/'
+                )
+                for name in files if name.endswith('.html')
+            )
+    return sorted(names)
+
+
+def warm_templates():
+    """Компилирует все шаблоны заранее, чтобы их держал кэширующий загрузчик
+
+    Возвращает число загруженных шаблонов.
+    """
+    warmed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            backend.engine.get_template(name)
+            warmed += 1
+    return warmed
@@ -1,15 +1,19 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
+
+# Страницы только для чтения: синхронные или асинхронные (для ASGI)
+read_views = async_views if settings.BLOG_ASYNC_VIEWS else views
 
 app_name = 'blog'
 
 urlpatterns = [
-    path('', views.HomePage.as_view(),
+    path('', read_views.HomePage.as_view(),
          name='index'),
     path('posts/create/', views.PostCreateView.as_view(),
          name='create_post'),
-    path('posts/<int:post_id>/', views.PostDetailView.as_view(),
+    path('posts/<int:post_id>/', read_views.PostDetailView.as_view(),
          name='post_detail'),
     path('posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
@@ -22,9 +26,18 @@ urlpatterns = [
     path('posts/<int:post_id>/delete_comment/<int:comment_id>',
          views.CommentDeleteView.as_view(), name='delete_comment'),
     path('category/<slug:category_slug>/',
-         views.PostCategoryListView.as_view(), name='category_posts'),
-    path('profile/<slug:username>/', views.ProfileListView.as_view(),
-         name='profile'),
+         read_views.PostCategoryListView.as_view(), name='category_posts'),
+    path('api/posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path('api/posts/<int:post_id>/', api.PostDetailApiView.as_view(),
+         name='api_post_detail'),
+    path('api/category/<slug:category_slug>/',
+         api.CategoryPostsApiView.as_view(), name='api_category_posts'),
+    path('api/profile/<slug:username>/', api.ProfilePostsApiView.as_view(),
+         name='api_profile'),
+    path('export/', views.ExportView.as_view(), name='export'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('profile/<slug:username>/',
+         read_views.ProfileListView.as_view(), name='profile'),
     path('edit_profile/<slug:username>/', views.ProfileUpdateView.as_view(),
          name='edit_profile'),
 ]
@@ -1,7 +1,8 @@
-from django.db.models import Count
-from django.utils import timezone
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
-from blog.models import Post
+from blog.models import Comment, Post
+from blog.publication import publication_cutoff
 
 
 def base_post_details(queryset):
@@ -15,12 +16,31 @@ def base_post_details(queryset):
 def get_published_posts():
     return Post.objects.filter(category__is_published=True,
                                is_published=True,
-                               pub_date__lte=timezone.now()
+                               pub_date__lte=publication_cutoff()
                                )
 
 
-def annotate_comment_count(queryset):
+def change_comment_count(post_id, delta):
+    return Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def _actual_comment_count():
+    return Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+
+
+def stale_comment_counts(queryset):
+    """Посты, у которых comment_count расходится с числом комментариев"""
     return queryset.annotate(
-        comment_count=Count(
-            'comments')
-    ).order_by('-pub_date')
+        actual_count=Coalesce(Subquery(_actual_comment_count()), 0)
+    ).exclude(comment_count=F('actual_count'))
+
+
+def recount_comment_counts(queryset=None):
+    queryset = Post.objects.all() if queryset is None else queryset
+    return stale_comment_counts(queryset).update(
+        comment_count=Coalesce(Subquery(_actual_comment_count()), 0)
+    )
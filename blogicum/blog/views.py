@@ -1,33 +1,51 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import transaction
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.views.generic import (CreateView, DeleteView,
-                                  DetailView, ListView, UpdateView)
+                                  DetailView, ListView, UpdateView, View)
 
 from blog.models import Category, Comment, Post
-from .constants import POST_VALUE_PER_PAGE
-from .mixins import (CommentBaseModelMixin, CommentDispatchMixin,
-                     GetUrlMixin, PostBaseModelMixin, UniqueUrlAtributMixin)
-from .utils import (base_post_details, get_published_posts,
-                    annotate_comment_count)
+from .constants import COMMENTS_PER_PAGE, POST_VALUE_PER_PAGE
+from .export import FORMATS, ExportError, check_filters, stream_export
+from .mixins import (AnonymousPageCacheMixin, CachedCountMixin,
+                     CommentBaseModelMixin, CommentDispatchMixin,
+                     CursorPaginationMixin,
+                     DispatchedObjectMixin, GetUrlMixin, PostBaseModelMixin,
+                     ReplicaReadMixin, UniqueUrlAtributMixin)
+from .utils import base_post_details, get_published_posts
 from .forms import CommentForm, UserForm
+from .images import process_post_image_job
+from .jobs import enqueue
+from .paginators import CursorPaginator
+from .search import get_search_backend
 
 
 User = get_user_model()
 
 
-class HomePage(ListView):
+class HomePage(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     """Главная страница сайта"""
 
     model = Post
     template_name = 'blog/index.html'
     paginate_by = POST_VALUE_PER_PAGE
 
+    def get_count_key(self):
+        return 'feed'
+
     def get_queryset(self):
-        return annotate_comment_count(
-            get_published_posts().order_by('-pub_date')
-        )
+        return base_post_details(get_published_posts())
 
 
 class PostCreateView(PostBaseModelMixin, LoginRequiredMixin, CreateView):
@@ -35,7 +53,10 @@ class PostCreateView(PostBaseModelMixin, LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if self.object.image:
+            enqueue(process_post_image_job, post_id=self.object.pk)
+        return response
 
     def get_success_url(self):
         username = self.request.user.username
@@ -44,50 +65,73 @@ class PostCreateView(PostBaseModelMixin, LoginRequiredMixin, CreateView):
             kwargs={'username': username})
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, DetailView):
     """Страница просмотра поста"""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    comments_paginate_by = COMMENTS_PER_PAGE
+    comments_cursor_kwarg = 'comments'
 
     def get_object(self):
-        post_id = self.kwargs.get('post_id')
-        start_queryset = Post.objects.all()
-        base_queryset = base_post_details(start_queryset)
-        post = get_object_or_404(base_queryset, pk=post_id)
-        if self.request.user == post.author:
+        post = get_object_or_404(
+            base_post_details(self.get_queryset()),
+            pk=self.kwargs['post_id']
+        )
+        if self.request.user.id == post.author_id:
             return post
-        else:
-            published_posts = get_published_posts()
-            base_queryset = base_post_details(published_posts)
-            post = get_object_or_404(
-                base_queryset,
-                pk=self.kwargs['post_id']
+        if not (post.is_published
+                and post.pub_date <= timezone.now()
+                and post.category is not None
+                and post.category.is_published):
+            raise Http404
+        return post
+
+    def get_comments_queryset(self):
+        return self.object.comments.select_related('author')
+
+    def get_comments_page(self):
+        paginator = CursorPaginator(
+            self.get_comments_queryset(),
+            self.comments_paginate_by,
+            ordering=('created_at', 'id')
+        )
+        try:
+            return paginator.page(
+                self.request.GET.get(self.comments_cursor_kwarg)
             )
-            return post
+        except InvalidPage as error:
+            raise Http404(str(error))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.all()
+        context['comments'] = self.get_comments_page()
         return context
 
 
 class PostUpdateView(
     PostBaseModelMixin,
     UniqueUrlAtributMixin,
+    DispatchedObjectMixin,
     LoginRequiredMixin,
     UpdateView
 ):
     """Редактировать пост"""
 
     def dispatch(self, request, *args, **kwargs):
-        posts = get_object_or_404(Post, id=self.kwargs['post_id'])
-        if request.user != posts.author:
-            return redirect('blog:post_detail', post_id=posts.pk)
+        self.object = get_object_or_404(Post, id=self.kwargs['post_id'])
+        if request.user.id != self.object.author_id:
+            return redirect('blog:post_detail', post_id=self.object.pk)
         return super().dispatch(request, *args, **kwargs)
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            enqueue(process_post_image_job, post_id=self.object.pk)
+        return response
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
@@ -98,18 +142,19 @@ class PostUpdateView(
 class PostDeleteView(
     PostBaseModelMixin,
     UniqueUrlAtributMixin,
+    DispatchedObjectMixin,
     LoginRequiredMixin,
     DeleteView
 ):
     """Удалить пост"""
 
     def dispatch(self, request, *args, **kwargs):
-        posts = get_object_or_404(
+        self.object = get_object_or_404(
             Post,
             id=self.kwargs['post_id']
         )
-        if request.user != posts.author:
-            return redirect('blog:post_detail, post_id=posts.pk')
+        if request.user.id != self.object.author_id:
+            return redirect('blog:post_detail', post_id=self.object.pk)
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
@@ -119,7 +164,13 @@ class PostDeleteView(
         )
 
 
-class PostCategoryListView(ListView):
+class PostCategoryListView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     """Просмотр категорий постов"""
 
     model = Post
@@ -132,20 +183,59 @@ class PostCategoryListView(ListView):
         context['category'] = self.category
         return context
 
+    def get_count_key(self):
+        return f"category:{self.kwargs['category_slug']}"
+
+    def get_post_count(self):
+        return self.category.published_post_count
+
     def get_queryset(self):
+        # Граница публикации вычисляется до чтения категории: при её
+        # сдвиге вышедшие посты попадают в счётчик категории
+        posts = get_published_posts()
         self.category = get_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
             is_published=True
         )
-        return annotate_comment_count(
-            get_published_posts().filter(
-                category_id=self.category,
-            ).order_by('-pub_date')
-        )
+        return base_post_details(posts.filter(category=self.category))
+
+
+class SearchView(ListView):
+    """Поиск по постам и комментариям"""
+
+    template_name = 'blog/search.html'
+    paginate_by = POST_VALUE_PER_PAGE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        post_ids = get_search_backend().search_posts(self.query)
+        published = set(get_published_posts().filter(
+            pk__in=post_ids
+        ).values_list('pk', flat=True))
+        return [pk for pk in post_ids if pk in published]
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super(
+        ).paginate_queryset(queryset, page_size)
+        posts = base_post_details(Post.objects.all()).in_bulk(list(page))
+        page.object_list = [posts[pk] for pk in page if pk in posts]
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ReplicaReadMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     """Страница профиля"""
 
     model = User
@@ -153,23 +243,31 @@ class ProfileListView(ListView):
     slug_url_kwarg = 'username'
     paginate_by = POST_VALUE_PER_PAGE
 
+    def get_count_key(self):
+        # Ключ не зависит от загруженного автора: асинхронный вид
+        # считает посты одновременно с его поиском
+        username = self.kwargs['username']
+        scope = ('all' if self.request.user.get_username() == username
+                 else 'published')
+        return f'author:{username}:{scope}'
+
+    def get_post_count(self):
+        if self.request.user == self.user:
+            return None
+        stats = getattr(self.user, 'stats', None)
+        return stats.published_post_count if stats else None
+
     def get_queryset(self):
-        self.user = get_object_or_404(User, username=self.kwargs['username'])
-        posts = annotate_comment_count(Post.objects.select_related(
-            'category',
-            'location',
-            'author'
-        ).filter(
-            author=self.user,
-        ).order_by(
-            '-pub_date'
-        )
+        # Как и для категории, счётчик автора читается после сдвига
+        # границы публикации
+        posts = get_published_posts()
+        self.user = get_object_or_404(
+            User.objects.select_related('stats'),
+            username=self.kwargs['username']
         )
         if self.request.user == self.user:
-            return posts
-        return annotate_comment_count(get_published_posts()).order_by(
-            '-pub_date'
-        )
+            return base_post_details(self.user.posts.all())
+        return base_post_details(posts.filter(author=self.user))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -212,7 +310,8 @@ class CommentCreateView(
         )
         form.instance.author = self.request.user
         form.instance.post = post
-        return super().form_valid(form)
+        with transaction.atomic():
+            return super().form_valid(form)
 
 
 class CommentUpdateView(
@@ -233,3 +332,36 @@ class CommentDeleteView(
     DeleteView
 ):
     """Удалить комментарий"""
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+
+class ExportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Потоковая выгрузка контента для аналитики"""
+
+    filter_params = ('date_from', 'date_to', 'category', 'author', 'after')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        output_format = request.GET.get('format', 'ndjson')
+        filters = {name: request.GET.get(name) or None
+                   for name in self.filter_params}
+        filters['models'] = request.GET.getlist('models') or None
+        try:
+            if output_format not in FORMATS:
+                raise ExportError(f'Неизвестный формат: {output_format}')
+            check_filters(**filters)
+        except ExportError as error:
+            return HttpResponseBadRequest(str(error))
+        response = StreamingHttpResponse(
+            stream_export(output_format, **filters),
+            content_type=f'{FORMATS[output_format]}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="blogicum.{output_format}"'
+        )
+        return response
@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+if settings.BLOG_TEMPLATE_WARMUP:
+    from blog.templating import warm_templates
+
+    warm_templates()
@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -7,16 +10,42 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
+# Settings profile from BLOGICUM_PROFILE:
+#   dev   local development: DEBUG and debug_toolbar (default);
+#   test  the test suite: no dev-only apps, fast password hashing;
+#   prod  deployment: no dev-only apps, hosts and secret key from the
+#         environment.
+# Dev-only apps and middleware are not imported outside the dev profile.
+PROFILES = ('dev', 'test', 'prod')
+
+PROFILE = os.environ.get('BLOGICUM_PROFILE', 'dev')
+
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_PROFILE must be one of {", ".join(PROFILES)}, '
+        f'not {PROFILE!r}'
+    )
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-)mz+p*$u)x1f6o@12gy=6&@0uv@9m0qnc^2+++l77=@-u2q)^d'
+# The committed key is only a fallback for dev and test; prod refuses to
+# start without BLOGICUM_SECRET_KEY.
+SECRET_KEY = os.environ.get('BLOGICUM_SECRET_KEY')
+
+if SECRET_KEY is None:
+    if PROFILE == 'prod':
+        raise ImproperlyConfigured(
+            'BLOGICUM_SECRET_KEY must be set in the prod profile'
+        )
+    SECRET_KEY = (
+        'django-insecure-)mz+p*$u)x1f6o@12gy=6&@0uv@9m0qnc^2+++l77=@-u2q)^d'
+    )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = PROFILE == 'dev'
 
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-]
+ALLOWED_HOSTS = os.environ.get(
+    'BLOGICUM_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
 
 
 # Application definition
@@ -31,10 +60,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_bootstrap5',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.QueryCountMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,9 +72,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+DEV_APPS = ['debug_toolbar']
+
+DEV_MIDDLEWARE = ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+if PROFILE == 'dev':
+    INSTALLED_APPS += DEV_APPS
+    MIDDLEWARE += DEV_MIDDLEWARE
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -65,19 +102,191 @@ TEMPLATES = [
     },
 ]
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# In prod compiled templates are kept in memory by the cached loader and
+# all of them are compiled when the WSGI/ASGI application starts. With
+# BLOGICUM_INLINE_TEMPLATES=1 the includes of matching pages are inlined
+# into one template per page, see blog.templating.InliningLoader.
+BLOG_TEMPLATE_WARMUP = PROFILE == 'prod'
+
+BLOG_INLINE_TEMPLATES = os.environ.get('BLOGICUM_INLINE_TEMPLATES') == '1'
+
+BLOG_INLINE_TEMPLATE_PATTERNS = ['blog/*.html']
+
+if PROFILE == 'prod':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader',
+        [('blog.templating.InliningLoader', TEMPLATE_LOADERS)]
+        if BLOG_INLINE_TEMPLATES else TEMPLATE_LOADERS,
+    )]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The backend is chosen by environment variables:
+#   BLOGICUM_DB_ENGINE          sqlite3 (default) or postgresql;
+#   BLOGICUM_DB_NAME            database name or SQLite file path;
+#   BLOGICUM_DB_USER, BLOGICUM_DB_PASSWORD, BLOGICUM_DB_HOST,
+#   BLOGICUM_DB_PORT            PostgreSQL connection parameters;
+#   BLOGICUM_DB_CONN_MAX_AGE    seconds to keep a connection between
+#                               requests, 0 closes it after each request;
+#   BLOGICUM_DB_POOL_SIZE       idle connections kept by the
+#                               process-wide pool of blog.backends, 0
+#                               disables the pool.
+# With the pool, connections are closed after each request by default and
+# go back to the pool, so threads share them instead of each thread
+# holding its own.
+
+DB_ENGINE = os.environ.get('BLOGICUM_DB_ENGINE', 'sqlite3')
+
+DB_POOL_SIZE = int(os.environ.get('BLOGICUM_DB_POOL_SIZE', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': (f'blog.backends.{DB_ENGINE}' if DB_POOL_SIZE
+                   else f'django.db.backends.{DB_ENGINE}'),
+        'NAME': os.environ.get(
+            'BLOGICUM_DB_NAME',
+            BASE_DIR / 'db.sqlite3' if DB_ENGINE == 'sqlite3' else 'blogicum'
+        ),
+        'USER': os.environ.get('BLOGICUM_DB_USER', ''),
+        'PASSWORD': os.environ.get('BLOGICUM_DB_PASSWORD', ''),
+        'HOST': os.environ.get('BLOGICUM_DB_HOST', ''),
+        'PORT': os.environ.get('BLOGICUM_DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get(
+            'BLOGICUM_DB_CONN_MAX_AGE', 0 if DB_POOL_SIZE else 60
+        )),
+        'POOL_SIZE': DB_POOL_SIZE,
+    }
+}
+
+# Read replicas: BLOGICUM_DB_REPLICAS is a comma-separated list of replica
+# hosts for PostgreSQL or replica files for SQLite. Replicas mirror the
+# default database in tests.
+BLOG_READ_REPLICAS = []
+
+for number, location in enumerate(
+    filter(None, os.environ.get('BLOGICUM_DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME' if DB_ENGINE == 'sqlite3' else 'HOST': location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_READ_REPLICAS.append(f'replica{number}')
+
+# GET requests to views with replica_reads read from a random replica, see
+# blog.middleware.ReplicaRoutingMiddleware. After a successful POST the
+# user's reads stay on the primary for BLOG_PRIMARY_PIN_SECONDS.
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+BLOG_PRIMARY_COOKIE = 'blog_primary'
+
+BLOG_PRIMARY_PIN_SECONDS = 10
+
+# PRAGMAs run on every new SQLite connection, see blog/db.py: WAL lets
+# readers work alongside a writer, NORMAL syncs only at checkpoints, reads
+# go through a memory map and a locked database is retried for up to
+# busy_timeout milliseconds instead of failing at once.
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+# The cache backend is chosen by environment variables:
+#   BLOGICUM_CACHE_BACKEND     filebased (default), db, memcached or locmem;
+#   BLOGICUM_CACHE_LOCATION    cache directory, table name or memcached
+#                              server address.
+# Cached pages, post cards and counts are invalidated by replacing version
+# keys in the cache (blog/cache.py), so every process has to see the same
+# cache. With locmem each process has its own copy: a change made by one
+# web worker, by the job worker or by a management command would stay
+# invisible to the others. locmem is only for a single process and is the
+# default of the test profile. filebased is shared by the processes of
+# one host, db and memcached by several hosts; the db table is created by
+# `manage.py createcachetable`.
+CACHE_BACKENDS = {
+    'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+CACHE_LOCATIONS = {
+    'filebased': BASE_DIR / 'cache',
+    'db': 'blog_cache',
+    'memcached': '127.0.0.1:11211',
+    'locmem': 'blogicum',
+}
+
+CACHE_BACKEND = os.environ.get(
+    'BLOGICUM_CACHE_BACKEND', 'locmem' if PROFILE == 'test' else 'filebased'
+)
+
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_CACHE_BACKEND must be one of '
+        f'{", ".join(CACHE_BACKENDS)}, not {CACHE_BACKEND!r}'
+    )
+
+SHARED_CACHE = CACHE_BACKEND != 'locmem'
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get(
+            'BLOGICUM_CACHE_LOCATION', str(CACHE_LOCATIONS[CACHE_BACKEND])
+        ),
     }
 }
 
+if CACHE_BACKEND != 'memcached':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+
+# With a shared cache, sessions are read from the cache and written
+# through to the database, and the session user is loaded from the cache
+# (blog/auth.py). With locmem a logout or a password change in one process
+# would not reach the copies cached by the others, so sessions stay in the
+# database and users are read by the plain ModelBackend.
+# BLOGICUM_SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies
+# keeps sessions in a signed cookie instead, with no storage at all.
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+SESSION_ENGINE = os.environ.get(
+    'BLOGICUM_SESSION_ENGINE',
+    CACHED_SESSION_ENGINES[1] if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
+
+if SESSION_ENGINE in CACHED_SESSION_ENGINES and not SHARED_CACHE:
+    raise ImproperlyConfigured(
+        f'{SESSION_ENGINE} needs a cache shared between processes, '
+        'set BLOGICUM_CACHE_BACKEND to filebased, db or memcached'
+    )
+
+AUTHENTICATION_BACKENDS = [
+    'blog.auth.CachedModelBackend' if SHARED_CACHE
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+
+
+if PROFILE == 'test':
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -139,3 +348,44 @@ MEDIA_ROOT = BASE_DIR / 'media'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Keyset pagination for post lists: opaque next/prev cursors instead of
+# page numbers, no OFFSET and no COUNT(*) per request.
+BLOG_CURSOR_PAGINATION = False
+
+# Async variants of the read-only pages from blog/async_views.py. They only
+# pay off when the site is served through blogicum.asgi.
+BLOG_ASYNC_VIEWS = False
+
+# Run independent queries of an async page in parallel, each in its own
+# thread and database connection, instead of one after another.
+BLOG_ASYNC_PARALLEL_QUERIES = False
+
+# Full-text search over posts and comments, see blog/search.py. The FTS5
+# index tables only exist on SQLite (migrations 0010 and 0011), other
+# databases search with LIKE.
+BLOG_SEARCH_BACKEND = (
+    'blog.search.SQLiteFTSBackend' if DB_ENGINE == 'sqlite3'
+    else 'blog.search.DatabaseSearchBackend'
+)
+
+# Per-request SQL statistics from blog.middleware.QueryCountMiddleware:
+# X-Query-* response headers and records in the `blog.queries` logger.
+BLOG_QUERY_COUNT_HEADERS = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
@@ -1,3 +1,4 @@
+from django.apps import apps
 from django.conf import settings
 from django.contrib import admin
 from django.conf.urls.static import static
@@ -20,7 +21,7 @@ urlpatterns = [
          name='registration'),
 ]
 
-if settings.DEBUG:
+if apps.is_installed('debug_toolbar'):
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
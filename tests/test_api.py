@@ -0,0 +1,107 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    cache.clear()
+    now = timezone.now()
+    return mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 13)),
+    )
+
+
+def test_feed_is_paginated_by_cursor(client, posts):
+    response = client.get('/api/posts/')
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [post['id'] for post in data['results']] == [
+        post.id for post in posts[:10]
+    ]
+    assert data['results'][0]['category']['slug'] == posts[0].category.slug
+    assert data['results'][0]['location'] == posts[0].location.name
+    assert 'text' not in data['results'][0]
+
+    data = client.get(data['next']).json()
+    assert [post['id'] for post in data['results']] == [
+        post.id for post in posts[10:]
+    ]
+    assert data['next'] is None and data['previous'] is not None
+
+
+def test_feed_reads_only_serialized_columns(client, posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/api/posts/')
+    feed = [query['sql'] for query in queries.captured_queries
+            if 'INNER JOIN "auth_user"' in query['sql']]
+    assert len(feed) == 1
+    assert '"blog_post"."text"' not in feed[0]
+    assert '"auth_user"."password"' not in feed[0]
+
+
+def test_conditional_get_returns_not_modified(client, posts):
+    response = client.get('/api/posts/')
+    etag = response['ETag']
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not [query for query in queries.captured_queries
+                if 'blog_' in query['sql']]
+
+    response = client.get(
+        '/api/posts/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_etag_changes_with_content(client, posts):
+    etag = client.get('/api/posts/')['ETag']
+    posts[0].title = 'Новый заголовок'
+    posts[0].save()
+    response = client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+    assert response.json()['results'][0]['title'] == 'Новый заголовок'
+
+
+def test_post_detail_with_comments(client, mixer, posts, another_user):
+    post = posts[0]
+    comment = mixer.blend('blog.Comment', post=post, author=another_user)
+    data = client.get(f'/api/posts/{post.id}/').json()
+    assert data['text'] == post.text
+    assert [(item['id'], item['author'], item['text'])
+            for item in data['comments']['results']] == [
+        (comment.id, another_user.username, comment.text)
+    ]
+    assert data['comments']['next'] is None
+
+
+def test_hidden_posts_follow_html_views(client, user_client, mixer, user,
+                                        published_category):
+    hidden = mixer.blend('blog.Post', author=user, is_published=False,
+                         category=published_category, pub_date=timezone.now())
+    assert client.get(f'/api/posts/{hidden.id}/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert user_client.get(f'/api/posts/{hidden.id}/').status_code == (
+        HTTPStatus.OK
+    )
+    profile = f'/api/profile/{user.username}/'
+    assert client.get(profile).json()['results'] == []
+    assert [post['id'] for post in user_client.get(profile).json()[
+        'results'
+    ]] == [hidden.id]
+    assert client.get('/api/category/missing/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog import async_views, views
+from blog.middleware import QueryCountMiddleware
+from blog.queries import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    cache.clear()
+    now = timezone.now()
+    return mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 13)),
+    )
+
+
+def render(view_class, path, user=None, **kwargs):
+    request = RequestFactory().get(path)
+    request.user = user or AnonymousUser()
+    request.session = SessionStore()
+    view = view_class.as_view()
+    if asyncio.iscoroutinefunction(view):
+        response = async_to_sync(view)(request, **kwargs)
+    else:
+        response = view(request, **kwargs)
+    response.render()
+    return response
+
+
+@pytest.mark.parametrize('name, path, kwargs', (
+    ('HomePage', '/', {}),
+    ('PostCategoryListView', '/category/{category}/',
+     {'category_slug': '{category}'}),
+    ('ProfileListView', '/profile/{author}/', {'username': '{author}'}),
+))
+def test_async_lists_match_sync_views(posts, name, path, kwargs):
+    values = {'category': posts[0].category.slug,
+              'author': posts[0].author.username}
+    path = path.format(**values)
+    kwargs = {key: value.format(**values) for key, value in kwargs.items()}
+    async_view = getattr(async_views, name)
+    assert asyncio.iscoroutinefunction(async_view.as_view())
+    expected = render(getattr(views, name), path, **kwargs)
+    cache.clear()
+    response = render(async_view, path, **kwargs)
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context_data['page_obj']) == list(
+        expected.context_data['page_obj']
+    )
+    assert response.content == expected.content
+
+
+def test_async_post_detail(mixer, posts, user, another_user):
+    post = posts[0]
+    comment = mixer.blend('blog.Comment', post=post, author=another_user)
+    response = render(async_views.PostDetailView, f'/posts/{post.id}/',
+                      post_id=post.id)
+    assert response.context_data['post'] == post
+    assert list(response.context_data['comments']) == [comment]
+
+    post.is_published = False
+    post.save()
+    with pytest.raises(Http404):
+        render(async_views.PostDetailView, f'/posts/{post.id}/',
+               post_id=post.id)
+    response = render(async_views.PostDetailView, f'/posts/{post.id}/',
+                      user=user, post_id=post.id)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_missing_category_is_not_found(posts):
+    with pytest.raises(Http404):
+        render(async_views.PostCategoryListView, '/category/missing/',
+               category_slug='missing')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_queries_use_own_connections(settings, posts):
+    settings.BLOG_ASYNC_PARALLEL_QUERIES = True
+    post = posts[0]
+    response = render(async_views.ProfileListView,
+                      f'/profile/{post.author.username}/',
+                      username=post.author.username)
+    assert response.context_data['profile'] == post.author
+    assert len(response.context_data['page_obj']) == 10
+
+
+def test_query_count_middleware_stays_async(settings, posts, user):
+    settings.BLOG_QUERY_COUNT_HEADERS = True
+    view = async_views.HomePage.as_view()
+
+    async def get_response(request):
+        response = await view(request)
+        await sync_to_async(response.render)()
+        return response
+
+    middleware = QueryCountMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware), (
+        'Под асинхронным видом слой учёта запросов должен быть асинхронным'
+    )
+
+    def make_request():
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = SessionStore()
+        return request
+
+    async def concurrent():
+        return await asyncio.gather(middleware(make_request()),
+                                    middleware(make_request()))
+
+    with record_queries() as recorder:
+        responses = async_to_sync(concurrent)()
+    counts = [int(response['X-Query-Count']) for response in responses]
+    assert all(counts) and sum(counts) == recorder.count, (
+        'Запросы одновременных страниц должны попадать в учёт своей страницы'
+    )
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+User = get_user_model()
+
+
+def auth_queries(client, url='/pages/about/'):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [query['sql'] for query in queries.captured_queries
+                      if 'django_session' in query['sql']
+                      or 'FROM "auth_user"' in query['sql']]
+
+
+@pytest.mark.skipif(not settings.SHARED_CACHE,
+                    reason='с кэшем процесса сессии хранятся в базе')
+def test_session_and_user_come_from_cache(user_client, user):
+    auth_queries(user_client)
+    response, queries = auth_queries(user_client)
+    assert response.context['user'] == user
+    assert queries == [], (
+        'Убедитесь, что сессия и пользователь не читаются из базы '
+        'на каждом запросе.'
+    )
+
+
+def test_profile_edit_refreshes_cached_user(user_client, user):
+    auth_queries(user_client)
+    response = user_client.post(f'/edit_profile/{user.username}/', data={
+        'username': user.username,
+        'first_name': 'Новое имя',
+        'last_name': user.last_name,
+        'email': user.email,
+    })
+    assert response.status_code == 302
+    response, _ = auth_queries(user_client)
+    assert response.context['user'].first_name == 'Новое имя'
+
+
+def test_password_change_ends_cached_sessions(user_client, user):
+    auth_queries(user_client)
+    user.set_password('new-password-123')
+    user.save()
+    response, _ = auth_queries(user_client)
+    assert not response.context['user'].is_authenticated
+
+
+def in_other_process(settings, code):
+    """Выполняет код в отдельном процессе с тем же файловым кэшем"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+           'BLOGICUM_CACHE_LOCATION': settings.CACHES['default']['LOCATION']}
+    subprocess.run(
+        [sys.executable, '-c', f'import django\ndjango.setup()\n{code}'],
+        cwd=settings.BASE_DIR, env=env, check=True,
+    )
+
+
+def test_logout_in_other_process_ends_session(settings, user_client):
+    auth_queries(user_client)
+    session_key = user_client.session.session_key
+    # Выход в другом процессе: запись сессии удаляется из базы, а из
+    # общего кэша её убирает сам процесс
+    Session.objects.filter(session_key=session_key).delete()
+    in_other_process(settings, (
+        'from django.contrib.sessions.backends.cached_db import '
+        'KEY_PREFIX\n'
+        'from django.core.cache import cache\n'
+        f'cache.delete(KEY_PREFIX + {session_key!r})'
+    ))
+    response, _ = auth_queries(user_client)
+    assert not response.context['user'].is_authenticated, (
+        'Убедитесь, что выход в одном процессе завершает сессию во всех.'
+    )
+
+
+def test_password_change_in_other_process_ends_session(
+        settings, user_client, user):
+    auth_queries(user_client)
+    user.set_password('new-password-123')
+    User.objects.filter(pk=user.pk).update(password=user.password)
+    in_other_process(settings, (
+        'from blog.cache import bump_version\n'
+        f'bump_version("user", {user.pk})'
+    ))
+    response, _ = auth_queries(user_client)
+    assert not response.context['user'].is_authenticated, (
+        'Убедитесь, что смена пароля в одном процессе завершает сессии '
+        'во всех.'
+    )
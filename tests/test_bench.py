@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+
+from blog.bench import (compare, database_profile, percentile, run_benchmark,
+                        run_render_benchmark)
+from blog.publication import STATE_KEY
+from blog.seeding import SyntheticData, finish_seeding
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def dataset(settings):
+    settings.BLOG_QUERY_COUNT_HEADERS = True
+    data = SyntheticData(seed=1)
+    data.posts(30, data.users(3), data.categories(2), data.locations(2), 1)
+    finish_seeding(recount=False)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([5], 95) == 5
+
+
+def test_benchmark_reports_every_route(dataset):
+    report = run_benchmark(requests=3, warmup=1)
+    assert set(report['routes']) >= {
+        'index', 'category', 'profile', 'post_detail', 'add_comment',
+        'edit_comment', 'delete_comment', 'admin_posts', 'admin_comments',
+    }
+    for result in report['routes'].values():
+        assert result['requests'] == 3
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['queries'] is not None
+    assert report['routes']['index_auth']['queries'] > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_benchmark_with_async_views(dataset):
+    report = run_benchmark('asgi', ['index', 'post_detail'], requests=4,
+                           warmup=1, concurrency=2, async_views=True)
+    assert report['async_views'] and report['concurrency'] == 2
+    assert {name: result['requests']
+            for name, result in report['routes'].items()} == {
+        'index': 4, 'post_detail': 4,
+    }
+    assert all(result['queries'] is not None
+               for result in report['routes'].values()), (
+        'Под ASGI учёт запросов должен работать со всей цепочкой слоёв'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_with_connection_pool(dataset):
+    engine = connection.settings_dict['ENGINE']
+    with database_profile(conn_max_age=0, pool_size=2):
+        report = run_benchmark('asgi', ['post_detail'], requests=4,
+                               warmup=1, concurrency=2)
+    assert (report['conn_max_age'], report['pool_size']) == (0, 2)
+    assert report['routes']['post_detail']['requests'] == 4
+    assert connection.settings_dict['ENGINE'] == engine
+
+
+def test_compare_flags_slower_and_heavier_routes():
+    baseline = {'routes': {
+        'index': {'p95_ms': 10.0, 'queries': 3},
+        'profile': {'p95_ms': 10.0, 'queries': 3},
+    }}
+    report = {'routes': {
+        'index': {'p95_ms': 11.0, 'queries': 3},
+        'profile': {'p95_ms': 15.0, 'queries': 4},
+        'about': {'p95_ms': 1.0, 'queries': 0},
+    }}
+    regressions = compare(report, baseline, threshold=0.2)
+    assert len(regressions) == 2
+    assert all(line.startswith('profile') for line in regressions)
+
+
+def test_benchmarks_leave_site_cache_alone(dataset):
+    cache.set('site-key', 'site-value')
+    cache.delete(STATE_KEY)
+    report = run_benchmark(routes=['index'], requests=2, warmup=1)
+    assert report['routes']['index']['requests'] == 2
+    run_render_benchmark(renders=2, warmup=1)
+    assert cache.get('site-key') == 'site-value', (
+        'Убедитесь, что бенчмарк не очищает кэш сайта.'
+    )
+    assert not cache.get(STATE_KEY), (
+        'Убедитесь, что бенчмарк не пишет в кэш сайта.'
+    )
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed(mixer, user, published_category):
+    cache.clear()
+    now = timezone.now()
+    return mixer.cycle(25).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 26)),
+    )
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [query['sql'] for query in queries.captured_queries
+                      if 'COUNT(' in query['sql']]
+
+
+@pytest.mark.parametrize('url, first_counts', (
+    ('/', 1),
+    # Число постов категории хранится в самой категории
+    ('/category/{post.category.slug}/', 0),
+    ('/profile/{post.author.username}/', 1),
+))
+def test_count_runs_once_per_feed(user_client, feed, url, first_counts):
+    url = url.format(post=feed[0])
+    response, counts = count_queries(user_client, url)
+    assert len(counts) == first_counts
+    assert response.context['paginator'].num_pages == 3
+    for page in (2, 3):
+        response, counts = count_queries(user_client, f'{url}?page={page}')
+        assert counts == [], (
+            'Убедитесь, что число постов берётся из кэша, а не считается '
+            'на каждой странице.'
+        )
+    assert len(response.context['page_obj']) == 5
+
+
+def test_post_changes_invalidate_count(user_client, mixer, feed):
+    user_client.get('/')
+    mixer.blend('blog.Post', author=feed[0].author,
+                category=feed[0].category, is_published=True,
+                pub_date=timezone.now() - timedelta(minutes=1))
+    response, counts = count_queries(user_client, '/?page=3')
+    assert len(counts) == 1
+    assert len(response.context['page_obj']) == 6
+
+
+def test_scheduled_post_going_live_invalidates_count(
+        user_client, mixer, monkeypatch, feed):
+    now = timezone.now()
+    mixer.blend('blog.Post', author=feed[0].author,
+                category=feed[0].category, is_published=True,
+                pub_date=now + timedelta(minutes=5))
+    assert user_client.get('/').context['paginator'].count == 25
+    monkeypatch.setattr('blog.publication.timezone.now',
+                        lambda: now + timedelta(minutes=10))
+    assert user_client.get('/').context['paginator'].count == 26
+
+
+def test_page_range_is_windowed(feed):
+    paginator = CachedCountPaginator(Post.objects.order_by('id'), 1)
+    window = list(paginator.get_elided_page_range(12, on_each_side=2,
+                                                  on_ends=1))
+    assert window == [1, paginator.ELLIPSIS, 10, 11, 12, 13, 14,
+                      paginator.ELLIPSIS, 25]
+
+
+def test_paginator_renders_window(rf, feed):
+    page = CachedCountPaginator(Post.objects.order_by('id'), 1).page(12)
+    html = render_to_string('includes/paginator.html', {'page_obj': page},
+                            request=rf.get('/', {'page': 12}))
+    assert 'page-item disabled' in html
+    assert [f'?page={number}"' in html for number in (1, 5, 10, 14, 20, 25)
+            ] == [True, False, True, True, False, True]
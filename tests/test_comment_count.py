@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+
+from blog.cache import post_card_key
+from blog.models import Comment, Post
+from blog.publication import publication_epoch
+
+pytestmark = [pytest.mark.django_db]
+
+
+def refreshed_count(post):
+    post.refresh_from_db(fields=('comment_count',))
+    return post.comment_count
+
+
+def test_comment_count_follows_comment_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/comment/'
+    for text in ('Первый', 'Второй'):
+        user_client.post(url, data={'text': text})
+    assert refreshed_count(post) == 2, (
+        'Убедитесь, что при создании комментария увеличивается '
+        '`Post.comment_count`.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}')
+    assert refreshed_count(post) == 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        '`Post.comment_count`.'
+    )
+
+
+def test_comment_count_follows_reassignment(
+        mixer, post_with_published_location, post_of_another_author):
+    comment = mixer.blend('blog.Comment', post=post_with_published_location)
+    assert refreshed_count(post_with_published_location) == 1
+
+    comment.post = post_of_another_author
+    comment.save()
+    assert refreshed_count(post_with_published_location) == 0
+    assert refreshed_count(post_of_another_author) == 1
+
+
+def test_recount_comments_repairs_counters(
+        mixer, post_with_published_location):
+    mixer.cycle(3).blend('blog.Comment', post=post_with_published_location)
+    Post.objects.update(comment_count=42)
+    card_key = post_card_key(post_with_published_location)
+    epoch = publication_epoch()
+
+    call_command('recount_comments', batch_size=1)
+
+    assert refreshed_count(post_with_published_location) == (
+        Comment.objects.filter(post=post_with_published_location).count()
+    )
+    assert post_card_key(post_with_published_location) != card_key
+    assert publication_epoch() != epoch, (
+        'Убедитесь, что после исправления счётчиков закэшированные '
+        'карточки и страницы становятся устаревшими.'
+    )
@@ -0,0 +1,39 @@
+import pytest
+
+from blog.constants import COMMENTS_PER_PAGE
+from blog.queries import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_comments_are_paginated(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        'blog.Comment', post=post
+    )
+    url = f'/posts/{post.id}/'
+
+    with record_queries() as recorder:
+        response = client.get(url)
+    first_page = response.context['comments']
+    assert len(first_page) == COMMENTS_PER_PAGE
+    assert recorder.count <= 2, (
+        'Убедитесь, что комментарии загружаются вместе с авторами '
+        'одним запросом.'
+    )
+
+    response = client.get(url, {'comments': first_page.next_cursor})
+    second_page = response.context['comments']
+    assert [comment.id for comment in second_page] == [
+        comment.id for comment in comments[COMMENTS_PER_PAGE:]
+    ]
+    assert second_page.has_previous() and not second_page.has_next()
+
+
+def test_invalid_comments_cursor_returns_404(
+        client, post_with_published_location):
+    response = client.get(
+        f'/posts/{post_with_published_location.id}/', {'comments': '!'}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import AuthorStats, Category, Location, Post
+from blog.publication import get_publication_state, publication_epoch
+
+pytestmark = [pytest.mark.django_db]
+
+
+def counters(post):
+    return (
+        Category.objects.get(pk=post.category_id).published_post_count,
+        Location.objects.get(pk=post.location_id).published_post_count,
+        AuthorStats.objects.get(pk=post.author_id).published_post_count,
+    )
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    cache.clear()
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+
+
+def test_new_user_gets_stats(user):
+    assert AuthorStats.objects.filter(user=user).exists()
+
+
+def test_publish_flip_updates_counters(post):
+    assert counters(post) == (1, 1, 1)
+    post.is_published = False
+    post.save()
+    assert counters(post) == (0, 0, 0)
+    post.is_published = True
+    post.save()
+    post.save()
+    assert counters(post) == (1, 1, 1)
+    post.delete()
+    assert counters(post) == (0, 0, 0)
+
+
+def test_moving_post_moves_count(mixer, post):
+    category = mixer.blend('blog.Category', is_published=True)
+    old_category = post.category
+    post.category = category
+    post.save()
+    assert Category.objects.get(pk=old_category.pk).published_post_count == 0
+    assert counters(post) == (1, 1, 1)
+
+
+def test_category_flip_updates_counters(post):
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert counters(post) == (0, 0, 0)
+    category.is_published = True
+    category.save()
+    assert counters(post) == (1, 1, 1)
+
+
+def test_scheduled_post_is_counted_when_live(monkeypatch, post):
+    now = timezone.now()
+    post.pub_date = now + timedelta(minutes=5)
+    post.save()
+    assert counters(post) == (0, 0, 0)
+    assert get_publication_state()['next'] == post.pub_date
+    monkeypatch.setattr('blog.publication.timezone.now',
+                        lambda: now + timedelta(minutes=10))
+    assert get_publication_state()['next'] is None
+    assert counters(post) == (1, 1, 1)
+
+
+def test_comment_counts_follow_author(mixer, post, user, another_user):
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    assert AuthorStats.objects.get(pk=user.pk).comment_count == 1
+    comment.author = another_user
+    comment.save()
+    assert AuthorStats.objects.get(pk=user.pk).comment_count == 0
+    assert AuthorStats.objects.get(pk=another_user.pk).comment_count == 1
+    comment.delete()
+    assert AuthorStats.objects.get(pk=another_user.pk).comment_count == 0
+
+
+def test_recount_command_repairs_drift(post, user):
+    Post.objects.filter(pk=post.pk).update(is_counted=False)
+    Category.objects.update(published_post_count=7)
+    AuthorStats.objects.filter(pk=user.pk).update(comment_count=3)
+    epoch = publication_epoch()
+    out = StringIO()
+    call_command('recount_counters', stdout=out)
+    assert publication_epoch() != epoch
+    epoch = publication_epoch()
+    call_command('recount_counters', stdout=out)
+    assert publication_epoch() == epoch
+    assert 'Готово' in out.getvalue()
+    assert counters(post) == (1, 1, 1)
+    assert AuthorStats.objects.get(pk=user.pk).comment_count == 0
+
+
+def test_profile_shows_stats(client, post, user):
+    response = client.get(f'/profile/{user.username}/')
+    assert response.context['paginator'].count == 1
+    assert 'Публикаций' in response.content.decode()
+
+
+@pytest.mark.parametrize('page', ('category', 'profile'))
+def test_pages_count_posts_going_live_on_request(
+        monkeypatch, mixer, page, post, another_user):
+    now = timezone.now()
+    mixer.cycle(9).blend('blog.Post', author=post.author,
+                         category=post.category, is_published=True,
+                         pub_date=now - timedelta(hours=2))
+    mixer.blend('blog.Post', author=post.author, category=post.category,
+                is_published=True, pub_date=now + timedelta(minutes=5))
+    get_publication_state()
+    monkeypatch.setattr('blog.publication.timezone.now',
+                        lambda: now + timedelta(minutes=10))
+    url = (f'/category/{post.category.slug}/' if page == 'category'
+           else f'/profile/{post.author.username}/')
+    client = Client()
+    client.force_login(another_user)
+    paginator = client.get(url).context['paginator']
+    assert (paginator.count, paginator.num_pages) == (11, 2), (
+        'Убедитесь, что число постов для страниц читается после учёта '
+        'вышедших в этом запросе отложенных постов.'
+    )
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.paginators import CursorPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+
+
+def test_cursor_paginator_walks_all_posts(posts_with_equal_dates):
+    from blog.models import Post
+
+    paginator = CursorPaginator(Post.objects.all(), N_PER_PAGE)
+    seen = []
+    page = paginator.page()
+    assert not page.has_previous()
+    while True:
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        page = paginator.page(page.next_cursor)
+    expected = sorted((post.id for post in posts_with_equal_dates),
+                      reverse=True)
+    assert seen == expected, (
+        'Убедитесь, что постраничный вывод по курсору возвращает каждый пост '
+        'ровно один раз, даже при совпадающих датах публикации.'
+    )
+
+    previous = paginator.page(page.previous_cursor)
+    assert [post.id for post in previous] == expected[
+        N_PER_PAGE:N_PER_PAGE * 2
+    ]
+    assert previous.has_next() and previous.has_previous()
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_index_uses_cursor_pagination(client, posts_with_equal_dates):
+    response = client.get('/')
+    page_obj = response.context['page_obj']
+    assert getattr(page_obj, 'is_cursor', False)
+    assert len(page_obj) == N_PER_PAGE
+    assert f'?cursor={page_obj.next_cursor}' in response.content.decode()
+
+    response = client.get('/', {'cursor': page_obj.next_cursor})
+    assert response.status_code == 200
+    assert response.context['page_obj'].has_previous()
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_invalid_cursor_returns_404(client, posts_with_equal_dates):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
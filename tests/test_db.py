@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+
+from blog.backends.sqlite3.base import DatabaseWrapper
+from blog.db import close_pools, get_pool
+
+
+@pytest.fixture
+def pooled(tmp_path, django_db_blocker):
+    settings_dict = {**connection.settings_dict,
+                     'NAME': str(tmp_path / 'pool.sqlite3'),
+                     'POOL_SIZE': 1, 'CONN_MAX_AGE': 0}
+    wrappers = []
+
+    def make():
+        wrapper = DatabaseWrapper(settings_dict, alias='pooled')
+        wrappers.append(wrapper)
+        return wrapper
+
+    # Своя база в файле, тестовую pytest-django она не затрагивает
+    with django_db_blocker.unblock():
+        yield make
+        for wrapper in wrappers:
+            wrapper.close()
+        close_pools()
+
+
+def pragma(wrapper, name):
+    wrapper.ensure_connection()
+    return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_sqlite_connection_is_tuned(settings):
+    assert pragma(connection, 'synchronous') == 1
+    assert pragma(connection, 'busy_timeout') == (
+        settings.BLOG_SQLITE_PRAGMAS['busy_timeout']
+    )
+
+
+def test_closed_connection_returns_to_pool(pooled):
+    first = pooled()
+    assert pragma(first, 'journal_mode') == 'wal'
+    raw = first.connection
+    first.close()
+    assert get_pool('pooled', first.settings_dict).idle == [raw]
+
+    second = pooled()
+    second.ensure_connection()
+    assert second.connection is raw and second.reused
+    assert get_pool('pooled', first.settings_dict).idle == []
+
+
+def test_pool_keeps_only_size_connections(pooled):
+    first, second = pooled(), pooled()
+    first.ensure_connection()
+    second.ensure_connection()
+    first.close()
+    second.close()
+    assert len(get_pool('pooled', first.settings_dict).idle) == 1
+
+
+def test_open_transaction_is_rolled_back(pooled):
+    wrapper = pooled()
+    with wrapper.cursor() as cursor:
+        cursor.execute('CREATE TABLE note (text TEXT)')
+    wrapper.set_autocommit(False)
+    with wrapper.cursor() as cursor:
+        cursor.execute("INSERT INTO note VALUES ('черновик')")
+    wrapper.close()
+
+    reader = pooled()
+    with reader.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM note')
+        assert cursor.fetchone() == (0,)
+
+
+def test_connection_closed_in_atomic_is_not_pooled(pooled):
+    wrapper = pooled()
+    wrapper.ensure_connection()
+    wrapper.in_atomic_block = True
+    wrapper.close()
+    assert get_pool('pooled', wrapper.settings_dict).idle == []
@@ -0,0 +1,153 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.importing import PostImporter
+from blog.models import Comment, Post
+from blog.search import get_search_backend
+
+pytestmark = [pytest.mark.django_db]
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def run_import(path, **options):
+    out, err = io.StringIO(), io.StringIO()
+    call_command('import_posts', path, stdout=out, stderr=err, **options)
+    return out.getvalue(), err.getvalue()
+
+
+def test_import_posts_from_ndjson(tmp_path, user, published_category,
+                                  published_location):
+    rows = [
+        {'title': 'Импорт', 'text': 'Перенесённая заметка про тюленей',
+         'pub_date': '2023-05-01T10:00:00', 'author': user.username,
+         'category': published_category.slug,
+         'location': published_location.name},
+        {'model': 'blog.post', 'pk': 99, 'fields': {
+            'title': 'Из выгрузки', 'text': 'Текст',
+            'pub_date': '2023-05-02T10:00:00Z', 'author': user.pk,
+            'category': published_category.pk, 'is_published': False,
+        }},
+    ]
+    path = write(tmp_path, 'posts.ndjson',
+                 '\n'.join(json.dumps(row, ensure_ascii=False)
+                           for row in rows))
+    out, _ = run_import(path, batch_size=1)
+    assert 'Импортировано: 2' in out
+    post = Post.objects.get(title='Импорт')
+    assert post.location == published_location
+    assert post.pub_date.tzinfo is not None
+    assert not Post.objects.get(title='Из выгрузки').is_published
+    assert post.pk in get_search_backend().search_posts('тюлени')
+    published_category.refresh_from_db()
+    published_location.refresh_from_db()
+    assert post.is_counted
+    assert published_category.published_post_count == 1
+    assert published_location.published_post_count == 1
+
+
+def test_invalid_rows_are_reported(tmp_path, user, published_category):
+    path = write(
+        tmp_path, 'posts.csv',
+        'title,text,pub_date,author,category\n'
+        f'Хороший,Текст,2023-05-01,{user.username},'
+        f'{published_category.slug}\n'
+        f'Без даты,Текст,,{user.username},{published_category.slug}\n'
+        'Чужой,Текст,2023-05-01,nobody,\n'
+    )
+    errors_path = tmp_path / 'errors.ndjson'
+    out, err = run_import(path, errors_path=str(errors_path))
+    assert 'Импортировано: 1, отклонено: 2' in out
+    assert 'Строка 3: pub_date' in err
+    assert 'Строка 4: author' in err
+    rejected = [json.loads(line) for line in
+                errors_path.read_text(encoding='utf-8').splitlines()]
+    assert [row['line'] for row in rejected] == [3, 4]
+
+
+def test_reference_lookups_are_batched(tmp_path, user, published_category,
+                                       django_assert_max_num_queries):
+    path = write(tmp_path, 'posts.ndjson', '\n'.join(json.dumps({
+        'title': f'Пост {number}', 'text': 'Текст',
+        'pub_date': '2023-05-01T10:00:00Z', 'author': user.username,
+        'category': published_category.slug,
+    }) for number in range(50)))
+    with django_assert_max_num_queries(15):
+        run_import(path, batch_size=25)
+    assert Post.objects.count() == 50
+
+
+def test_import_comments_updates_counters(tmp_path, user, mixer):
+    post = mixer.blend('blog.Post', author=user)
+    path = write(tmp_path, 'comments.csv',
+                 'post,author,text\n'
+                 f'{post.pk},{user.username},Первый\n'
+                 f'{post.pk},{user.username},Второй\n')
+    run_import(path, model='comment')
+    post.refresh_from_db()
+    assert post.comment_count == Comment.objects.count() == 2
+
+
+def test_import_keeps_created_at(tmp_path, user, mixer):
+    post = mixer.blend('blog.Post', author=user)
+    path = write(tmp_path, 'comments.csv',
+                 'post,author,text,created_at\n'
+                 f'{post.pk},{user.username},Поздний,2021-03-02T10:00:00Z\n'
+                 f'{post.pk},{user.username},Ранний,2021-03-01T10:00:00Z\n'
+                 f'{post.pk},{user.username},Без даты,\n')
+    started = timezone.now()
+    run_import(path, model='comment')
+    texts = list(Comment.objects.order_by('created_at')
+                 .values_list('text', flat=True))
+    assert texts == ['Ранний', 'Поздний', 'Без даты'], (
+        'Комментарии должны сохранять даты из импортируемых строк'
+    )
+    assert Comment.objects.get(text='Без даты').created_at >= started, (
+        'Строка без даты должна получить время импорта'
+    )
+
+
+def test_dry_run_and_error_limit(tmp_path, user):
+    path = write(tmp_path, 'posts.ndjson', 'not json\n{"title": ""}\n')
+    out, _ = run_import(path, dry_run=True)
+    assert 'Проверено: 0, отклонено: 2' in out
+    with pytest.raises(CommandError, match='лимит'):
+        run_import(path, max_errors=1)
+
+
+def test_ambiguous_natural_key_is_rejected(tmp_path, mixer, user,
+                                           published_category):
+    first, second = mixer.cycle(2).blend('blog.Location', name='Казань')
+    path = write(tmp_path, 'posts.ndjson', '\n'.join(json.dumps({
+        'title': 'Пост', 'text': 'Текст', 'pub_date': '2023-05-01T10:00:00Z',
+        'author': user.username, 'category': published_category.slug,
+        'location': location,
+    }, ensure_ascii=False) for location in ('Казань', second.pk)))
+    out, err = run_import(path)
+    assert 'Импортировано: 1, отклонено: 1' in out
+    assert 'Строка 1: location' in err
+    assert Post.objects.get().location == second
+
+
+def test_posts_created_during_import_are_reindexed(
+        tmp_path, mixer, user, published_category):
+    importer = PostImporter()
+    site_post = mixer.blend('blog.Post', author=user,
+                            category=published_category, is_published=True,
+                            pub_date=timezone.now(), title='Заметка с сайта')
+    assert importer.run([(1, {
+        'title': 'Импорт', 'text': 'Текст', 'author': user.username,
+        'pub_date': '2023-05-01T10:00:00Z',
+        'category': published_category.slug,
+    })]) == 1
+    published_category.refresh_from_db()
+    assert published_category.published_post_count == 2
+    assert get_search_backend().search_posts('заметка') == [site_post.pk]
@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import process_post_image_job
+from blog.jobs import enqueue, run_pending_jobs
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+def recording_task(value):
+    CALLS.append(value)
+
+
+def failing_task():
+    raise RuntimeError('boom')
+
+
+def test_job_runs_and_is_marked_done():
+    CALLS.clear()
+    job = enqueue(recording_task, value=7)
+    assert run_pending_jobs() == [Job.Status.DONE]
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert job.attempts == 1
+    assert CALLS == [7]
+
+
+def test_failing_job_is_retried_with_backoff():
+    job = enqueue(failing_task)
+    assert run_pending_jobs() == [Job.Status.PENDING]
+    job.refresh_from_db()
+    assert job.run_after > timezone.now()
+    assert 'RuntimeError: boom' in job.last_error
+    assert run_pending_jobs() == [], (
+        'Убедитесь, что повторная попытка откладывается.'
+    )
+
+    Job.objects.update(run_after=timezone.now(), attempts=job.max_attempts - 1)
+    assert run_pending_jobs() == [Job.Status.FAILED]
+
+
+def test_run_jobs_command_processes_queue():
+    CALLS.clear()
+    for value in range(3):
+        enqueue(recording_task, value=value)
+    call_command('run_jobs', once=True, workers=1)
+    assert sorted(CALLS) == [0, 1, 2]
+    assert not Job.objects.exclude(status=Job.Status.DONE).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_pool_runs_each_job_once():
+    CALLS.clear()
+    for value in range(6):
+        enqueue(recording_task, value=value)
+    statuses = run_pending_jobs(workers=3)
+    assert statuses == [Job.Status.DONE] * 6
+    assert sorted(CALLS) == list(range(6))
+
+
+def test_image_job_strips_exif(settings, tmp_path, mixer):
+    settings.MEDIA_ROOT = tmp_path
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300)).save(buffer, 'JPEG', exif=exif)
+    post = mixer.blend('blog.Post', image=None)
+    post.image.save('photo.jpg', ContentFile(buffer.getvalue()))
+
+    enqueue(process_post_image_job, post_id=post.id)
+    run_pending_jobs()
+    post.refresh_from_db()
+
+    with Image.open(tmp_path / post.image.name) as image:
+        assert not image.getexif(), 'Убедитесь, что EXIF удаляется из фото.'
+    assert post.image_variants['jpeg']
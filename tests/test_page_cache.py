@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.constants import PAGE_CACHE_TIMEOUT
+from blog.publication import (STATE_KEY, publication_cutoff,
+                              publication_epoch)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_cache_timeouts(monkeypatch):
+    cache.clear()
+    timeouts = []
+    original_set = cache.set
+
+    def recording_set(key, value, timeout=None, *args, **kwargs):
+        if key.startswith('blog:page:'):
+            timeouts.append(timeout)
+        return original_set(key, value, timeout, *args, **kwargs)
+
+    monkeypatch.setattr(cache, 'set', recording_set)
+    return timeouts
+
+
+def test_scheduled_post_goes_live_through_page_cache(
+        mixer, monkeypatch, client, user, published_category):
+    cache.clear()
+    now = timezone.now()
+    scheduled = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(seconds=90),
+        title='Отложенная публикация',
+    )
+    assert scheduled.title not in client.get('/').content.decode()
+
+    monkeypatch.setattr(
+        'blog.publication.timezone.now', lambda: now + timedelta(minutes=2)
+    )
+    assert scheduled.title in client.get('/').content.decode(), (
+        'Убедитесь, что отложенный пост появляется в закэшированной ленте '
+        'сразу после наступления даты публикации.'
+    )
+
+
+def test_publication_epoch_is_stable_until_go_live(
+        mixer, monkeypatch, user, published_category):
+    cache.clear()
+    now = timezone.now()
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True, pub_date=now + timedelta(hours=1))
+    epoch = publication_epoch()
+    cutoff = publication_cutoff()
+    assert publication_epoch() == epoch
+    assert publication_cutoff() == cutoff
+
+    monkeypatch.setattr(
+        'blog.publication.timezone.now', lambda: now + timedelta(hours=2)
+    )
+    assert publication_epoch() != epoch
+    assert publication_cutoff() > cutoff
+
+
+def test_page_cache_uses_default_timeout(
+        client, post_with_published_location, page_cache_timeouts):
+    client.get('/')
+    assert page_cache_timeouts == [PAGE_CACHE_TIMEOUT]
+
+
+def test_page_cache_is_not_used_for_authenticated_users(
+        user_client, post_with_published_location, page_cache_timeouts):
+    user_client.get('/')
+    assert page_cache_timeouts == []
+
+
+def test_page_cache_is_invalidated_by_new_post(
+        mixer, client, user, post_with_published_location):
+    cache.clear()
+    client.get('/')
+    post = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        category=post_with_published_location.category,
+        pub_date=timezone.now() - timedelta(minutes=1),
+        title='Свежая публикация',
+    )
+    content = client.get('/').content.decode()
+    assert post.title in content, (
+        'Убедитесь, что кэш страницы сбрасывается при добавлении поста.'
+    )
+
+
+def test_publication_epoch_survives_state_expiry(
+        mixer, monkeypatch, user, published_category):
+    cache.clear()
+    now = timezone.now()
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True, pub_date=now + timedelta(hours=1))
+    epoch = publication_epoch()
+    cache.delete(STATE_KEY)
+    monkeypatch.setattr(
+        'blog.publication.timezone.now', lambda: now + timedelta(minutes=5)
+    )
+    assert publication_epoch() == epoch, (
+        'Убедитесь, что эпоха публикации не меняется при пересчёте '
+        'состояния, если ни один пост не вышел.'
+    )
+    assert publication_cutoff() > now
+
+
+def test_login_keeps_page_cache(client, user):
+    cache.clear()
+    user.set_password('password-123')
+    user.save()
+    epoch = publication_epoch()
+    assert client.login(username=user.username, password='password-123')
+    assert publication_epoch() == epoch, (
+        'Убедитесь, что вход пользователя не сбрасывает кэш страниц.'
+    )
+    user.username = 'renamed'
+    user.save()
+    assert publication_epoch() != epoch, (
+        'Убедитесь, что смена имени автора сбрасывает кэш страниц.'
+    )
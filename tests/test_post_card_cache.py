@@ -0,0 +1,48 @@
+import pytest
+from django.core.cache import cache
+
+from blog.cache import post_card_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_post(post_with_published_location):
+    cache.clear()
+    return post_with_published_location
+
+
+def test_post_card_is_cached(client, feed_post):
+    client.get('/')
+    assert cache.get(post_card_key(feed_post)) is not None, (
+        'Убедитесь, что отрендеренная карточка поста сохраняется в кэше.'
+    )
+
+
+@pytest.mark.parametrize('change', ('post', 'category', 'location',
+                                    'author', 'comment'))
+def test_post_card_invalidation(change, mixer, client, feed_post):
+    client.get('/')
+    if change == 'post':
+        feed_post.title = 'Новый заголовок'
+        feed_post.save()
+        expected = 'Новый заголовок'
+    elif change == 'category':
+        feed_post.category.title = 'Новая категория'
+        feed_post.category.save()
+        expected = 'Новая категория'
+    elif change == 'location':
+        feed_post.location.name = 'Новое место'
+        feed_post.location.save()
+        expected = 'Новое место'
+    elif change == 'author':
+        feed_post.author.username = 'renamed_author'
+        feed_post.author.save()
+        expected = '@renamed_author'
+    else:
+        mixer.blend('blog.Comment', post=feed_post)
+        expected = 'Комментарии (1)'
+    content = client.get('/').content.decode()
+    assert expected in content, (
+        f'Убедитесь, что карточка поста обновляется при изменении: {change}.'
+    )
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from blog.constants import IMAGE_VARIANT_WIDTHS
+from blog.jobs import run_pending_jobs
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    cache.clear()
+    return tmp_path
+
+
+def make_upload(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(73, 109, 137)).save(
+        buffer, format='JPEG'
+    )
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(),
+                              content_type='image/jpeg')
+
+
+def create_post(client, published_category, image):
+    response = client.post('/posts/create/', data={
+        'title': 'Пост с фото',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%d'),
+        'category': published_category.id,
+        'image': image,
+    })
+    assert response.status_code == 302
+    run_pending_jobs()
+    return Post.objects.get(title='Пост с фото')
+
+
+def test_upload_creates_image_variants(
+        media_root, user_client, published_category):
+    post = create_post(user_client, published_category,
+                       make_upload(1200, 600))
+
+    assert set(post.image_variants) == {'webp', 'jpeg'}
+    for image_format, image_type in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+        variants = post.image_variants[image_format]
+        assert sorted(map(int, variants)) == list(IMAGE_VARIANT_WIDTHS)
+        for width, name in variants.items():
+            with Image.open(media_root / name) as variant:
+                assert variant.format == image_type
+                assert variant.width == int(width)
+
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert 'type="image/webp"' in content
+    assert f"{IMAGE_VARIANT_WIDTHS[0]}w" in content
+
+
+def test_small_upload_keeps_original_width(
+        media_root, user_client, published_category):
+    post = create_post(user_client, published_category,
+                       make_upload(200, 100))
+    assert list(post.image_variants['webp']) == ['200']
+
+
+def test_image_replacement_removes_old_variants(
+        media_root, user_client, published_category):
+    post = create_post(user_client, published_category,
+                       make_upload(800, 400))
+    old_names = list(post.image_variants['jpeg'].values())
+
+    user_client.post(f'/posts/{post.id}/edit/', data={
+        'title': post.title,
+        'text': post.text,
+        'pub_date': timezone.now().strftime('%Y-%m-%d'),
+        'category': published_category.id,
+        'image': make_upload(400, 200),
+    })
+    run_pending_jobs()
+    post.refresh_from_db()
+
+    assert list(post.image_variants['jpeg']) == ['320']
+    assert not any((media_root / name).exists() for name in old_names)
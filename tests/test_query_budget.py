@@ -0,0 +1,155 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import pytest
+from django.utils import timezone
+
+from blog.queries import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+N_SEED_POSTS = 120
+N_SEED_COMMENTS = 40
+
+
+@pytest.fixture
+def seeded_blog(mixer, user, another_user, published_category,
+                another_category, published_locations):
+    now = timezone.now()
+    posts = mixer.cycle(N_SEED_POSTS).blend(
+        'blog.Post',
+        author=mixer.sequence(user, another_user),
+        category=mixer.sequence(published_category, another_category),
+        location=mixer.sequence(*published_locations),
+        is_published=True,
+        pub_date=(now - timedelta(hours=hour) for hour in range(
+            N_SEED_POSTS)),
+        image='',
+    )
+    hot_post = posts[0]
+    comments = mixer.cycle(N_SEED_COMMENTS).blend(
+        'blog.Comment',
+        post=hot_post,
+        author=mixer.sequence(user, another_user),
+    )
+    return {
+        'post': hot_post,
+        'category': published_category,
+        'own_comment': next(c for c in comments if c.author == user),
+    }
+
+
+# Максимальное число SQL-запросов на страницу при пустом кэше.
+# Авторизованный клиент тратит два запроса на сессию и пользователя.
+QUERY_BUDGETS = {
+    'index': 3,
+    'category': 4,
+    'profile': 4,
+    'post_detail': 2,
+    'create_post': 2,
+    'edit_post': 3,
+    'delete_post': 1,
+    'edit_comment': 1,
+    'delete_comment': 1,
+    'edit_profile': 0,
+    'about': 0,
+    'rules': 0,
+    'search': 4,
+    'export': 4,
+    'api_posts': 2,
+    'api_post_detail': 3,
+    'api_category_posts': 3,
+    'api_profile': 3,
+}
+# Выгрузка доступна только сотрудникам
+STAFF_ROUTES = {'export'}
+# Пользователь сессии читается из базы только при первом запросе
+AUTH_QUERIES = 1
+
+
+def route_urls(seeded_blog, user):
+    post = seeded_blog['post']
+    comment = seeded_blog['own_comment']
+    return {
+        'index': ('/', False),
+        'category': (f"/category/{seeded_blog['category'].slug}/", False),
+        'profile': (f'/profile/{user.username}/', False),
+        'post_detail': (f'/posts/{post.id}/', False),
+        'create_post': ('/posts/create/', True),
+        'edit_post': (f'/posts/{post.id}/edit/', True),
+        'delete_post': (f'/posts/{post.id}/delete/', True),
+        'edit_comment': (
+            f'/posts/{post.id}/edit_comment/{comment.id}/', True
+        ),
+        'delete_comment': (
+            f'/posts/{post.id}/delete_comment/{comment.id}', True
+        ),
+        'edit_profile': (f'/edit_profile/{user.username}/', True),
+        'about': ('/pages/about/', False),
+        'rules': ('/pages/rules/', False),
+        'search': (f"/search/?{urlencode({'q': post.title})}", False),
+        'export': ('/export/', True),
+        'api_posts': ('/api/posts/', False),
+        'api_post_detail': (f'/api/posts/{post.id}/', False),
+        'api_category_posts': (
+            f"/api/category/{seeded_blog['category'].slug}/", False
+        ),
+        'api_profile': (f'/api/profile/{user.username}/', False),
+    }
+
+
+@pytest.mark.parametrize('route', QUERY_BUDGETS)
+def test_route_query_budget(route, seeded_blog, user, client, user_client):
+    url, login_required = route_urls(seeded_blog, user)[route]
+    budget = QUERY_BUDGETS[route]
+    if route in STAFF_ROUTES:
+        user.is_staff = True
+        user.save()
+    clients = [(user_client, budget + AUTH_QUERIES)]
+    if not login_required:
+        clients.append((client, budget))
+    for http_client, limit in clients:
+        with record_queries() as recorder:
+            response = http_client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code == 200, url
+        assert recorder.count <= limit, (
+            f'Страница `{url}` выполняет {recorder.count} SQL-запросов '
+            f'при бюджете {limit}.'
+        )
+        assert not recorder.duplicates, (
+            f'Страница `{url}` повторяет одинаковые SQL-запросы.'
+        )
+
+
+@pytest.mark.parametrize('route', ('index', 'category'))
+def test_cached_anonymous_pages_skip_database(
+        route, seeded_blog, user, client):
+    url, _ = route_urls(seeded_blog, user)[route]
+    client.get(url)
+    with record_queries() as recorder:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert recorder.count == 0, (
+        f'Убедитесь, что страница `{url}` для анонимных пользователей '
+        'отдаётся из кэша.'
+    )
+
+
+def test_add_comment_query_budget(seeded_blog, user_client):
+    post = seeded_blog['post']
+    with record_queries() as recorder:
+        response = user_client.post(
+            f'/posts/{post.id}/comment/', data={'text': 'Комментарий'}
+        )
+    assert response.status_code == 302
+    assert recorder.count <= 8 + AUTH_QUERIES
+
+
+def test_query_count_headers(settings, client, seeded_blog):
+    settings.BLOG_QUERY_COUNT_HEADERS = True
+    response = client.get('/')
+    assert int(response['X-Query-Count']) <= QUERY_BUDGETS['index']
+    assert response['X-Query-Duplicates'] == '0'
+    assert response['X-Query-Time'].endswith('ms')
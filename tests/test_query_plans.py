@@ -0,0 +1,54 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+TABLE_SCAN = re.compile(r'\bSCAN (blog_post|blog_comment)\b(?!.*INDEX)')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def blog_query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return {
+        query['sql']: explain(query['sql'])
+        for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and ('blog_post' in query['sql'] or 'blog_comment' in query['sql'])
+    }
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite-only'
+)
+@pytest.mark.parametrize('url_name', ('index', 'category', 'profile',
+                                      'detail'))
+def test_list_queries_use_indexes(
+        url_name, client, user, published_category,
+        post_with_published_location, comment_to_a_post):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+        'detail': f'/posts/{post_with_published_location.id}/',
+    }[url_name]
+    plans = blog_query_plans(client, url)
+    assert plans
+    for sql, plan in plans.items():
+        scans = [step for step in plan if TABLE_SCAN.search(step)]
+        assert not scans, (
+            f'Запрос страницы `{url}` просматривает таблицу целиком: '
+            f'{scans}\n{sql}'
+        )
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in plan, (
+            f'Сортировка на странице `{url}` не использует индекс.\n{sql}'
+        )
@@ -0,0 +1,112 @@
+import sqlite3
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, connections
+from django.utils import timezone
+
+from blog.models import Post
+from blog.routers import ReplicaRouter, current_replica, read_from
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Снимок основной базы в отдельном файле SQLite
+
+    Реплика получает данные только при вызове sync(), так что всё
+    записанное после него имитирует отставание репликации.
+    """
+    path = str(tmp_path / 'replica.sqlite3')
+
+    def sync():
+        connections['replica'].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+    connections.settings['replica'] = {**connection.settings_dict,
+                                       'NAME': path}
+    settings.BLOG_READ_REPLICAS = ['replica']
+    cache.clear()
+    yield sync
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True,
+                       pub_date=timezone.now() - timedelta(hours=1))
+
+
+def test_router_reads_from_current_replica(settings):
+    settings.BLOG_READ_REPLICAS = ['replica']
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) is None
+    with read_from('replica'):
+        assert router.db_for_read(Post) == 'replica'
+        assert router.db_for_write(Post) == 'default'
+    assert current_replica.get() is None
+
+
+def test_read_views_use_replica(client, replica, post, mixer):
+    replica()
+    fresh = mixer.blend('blog.Post', author=post.author,
+                        category=post.category, is_published=True,
+                        pub_date=timezone.now() - timedelta(minutes=1))
+    assert client.get(f'/posts/{post.id}/').status_code == HTTPStatus.OK
+    assert client.get(f'/posts/{fresh.id}/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    replica()
+    assert client.get(f'/posts/{fresh.id}/').status_code == HTTPStatus.OK
+
+
+def test_writer_is_pinned_to_primary(settings, user_client, replica, post):
+    replica()
+    response = user_client.post('/posts/create/', data={
+        'title': 'Свежий пост',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%d'),
+        'category': post.category.id,
+    }, follow=True)
+    assert settings.BLOG_PRIMARY_COOKIE in user_client.cookies
+    assert 'Свежий пост' in response.content.decode()
+
+    del user_client.cookies[settings.BLOG_PRIMARY_COOKIE]
+    response = user_client.get(f'/profile/{post.author.username}/')
+    assert response.status_code == HTTPStatus.OK
+    assert 'Свежий пост' not in response.content.decode()
+
+
+def test_lagging_replica_does_not_fill_page_cache(client, replica, post,
+                                                   mixer):
+    replica()
+    fresh = mixer.blend('blog.Post', author=post.author,
+                        category=post.category, is_published=True,
+                        title='Пост после снимка',
+                        pub_date=timezone.now() - timedelta(minutes=1))
+    client.get('/')
+    replica()
+    assert fresh.title in client.get('/').content.decode(), (
+        'Страница из кэша не должна хранить данные отстающей реплики'
+    )
+
+
+def test_lagging_replica_does_not_fill_post_cards(user_client, replica,
+                                                  post):
+    replica()
+    post.title = 'Новый заголовок'
+    post.save()
+    user_client.get('/')
+    replica()
+    assert post.title in user_client.get('/').content.decode(), (
+        'Карточка поста не должна хранить данные отстающей реплики'
+    )
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog import search
+from blog.search import analyze, get_search_backend, recency_boost
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    return {
+        'title': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, title='Путешествие на Байкал',
+            text='Озеро и горы.'
+        ),
+        'text': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, title='Заметки',
+            text='Вчера мы видели байкальскую нерпу.'
+        ),
+        'hidden': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=False, title='Черновик про Байкал', text='...'
+        ),
+    }
+
+
+def search_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_by_title_and_text(client, searchable_posts):
+    assert search_ids(client, 'путешествие') == [
+        searchable_posts['title'].id
+    ]
+    assert search_ids(client, 'нерпу') == [searchable_posts['text'].id]
+    assert searchable_posts['hidden'].id not in search_ids(client, 'байкал'), (
+        'Убедитесь, что в результаты поиска не попадают скрытые посты.'
+    )
+
+
+def test_search_matches_prefixes(client, searchable_posts):
+    assert set(search_ids(client, 'байк')) == {
+        searchable_posts['title'].id, searchable_posts['text'].id
+    }
+
+
+def test_search_matches_inflected_forms(client, searchable_posts):
+    assert search_ids(client, 'нерпы') == [searchable_posts['text'].id]
+    assert search_ids(client, 'путешествия') == [
+        searchable_posts['title'].id
+    ]
+
+
+def test_analyze_stems_russian_words():
+    assert analyze('Ёлки и ЕЛКА') == analyze('елка и елки')
+    assert analyze('нерпу')[0] == analyze('нерпами')[0]
+
+
+def test_title_matches_rank_higher(mixer, client, user, published_category):
+    in_text = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Дневник', text='Рассказ про маяк.',
+        pub_date=timezone.now(),
+    )
+    in_title = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Маяки', text='Рассказ.',
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert search_ids(client, 'маяк') == [in_title.id, in_text.id]
+
+
+def test_recent_posts_rank_higher(mixer, client, user, published_category):
+    now = timezone.now()
+    old, new = (
+        mixer.blend('blog.Post', author=user, category=published_category,
+                    is_published=True, title='Маяк', text='Маяк.',
+                    pub_date=now - timedelta(days=days))
+        for days in (365, 1)
+    )
+    assert search_ids(client, 'маяк') == [new.id, old.id]
+    assert recency_boost(now) > recency_boost(now - timedelta(days=1))
+
+
+def test_relevance_outweighs_recency(
+        mixer, client, user, published_category):
+    now = timezone.now()
+    strong = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Маяк', text='Маяк. ' * 5,
+        pub_date=now - timedelta(days=365),
+    )
+    weak = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Дневник',
+        text='Долгая прогулка вдоль берега. ' * 20 + 'Вдали был маяк.',
+        pub_date=now,
+    )
+    assert search_ids(client, 'маяк') == [strong.id, weak.id], (
+        'Убедитесь, что свежесть не перевешивает явно большую '
+        'релевантность старого поста.'
+    )
+
+
+def test_far_dates_keep_ranking(mixer, client, user, published_category):
+    future = mixer.blend('blog.Post', author=user,
+                         category=published_category, is_published=True,
+                         title='Маяк', text='...',
+                         pub_date=datetime(2400, 1, 1, tzinfo=dt_timezone.utc))
+    past = [mixer.blend('blog.Post', author=user,
+                        category=published_category, is_published=True,
+                        title=title, text='Маяк на скале',
+                        pub_date=datetime(1897, 1, 1, tzinfo=dt_timezone.utc))
+            for title in ('Маяк', 'Скалы')]
+    assert 0 < recency_boost(past[0].pub_date) < recency_boost(future.pub_date)
+    assert recency_boost(datetime(1700, 1, 1, tzinfo=dt_timezone.utc)) > 0
+    backend = get_search_backend()
+    assert backend.search_posts('маяк')[0] == future.id
+    assert backend.search_posts('маяк')[1:] == [past[0].id, past[1].id], (
+        'Убедитесь, что у старых постов сохраняется порядок по релевантности.'
+    )
+
+
+def test_search_finds_posts_by_comment_text(
+        mixer, client, searchable_posts):
+    mixer.blend('blog.Comment', post=searchable_posts['title'],
+                text='Отличная фотография заката')
+    assert search_ids(client, 'заката') == [searchable_posts['title'].id]
+
+
+def test_search_index_follows_changes(client, searchable_posts):
+    post = searchable_posts['title']
+    post.title = 'Поездка в Карелию'
+    post.save()
+    assert search_ids(client, 'карелию') == [post.id]
+    assert search_ids(client, 'путешествие') == []
+
+    post.delete()
+    assert search_ids(client, 'карелию') == []
+
+
+def test_empty_query_returns_nothing(client, searchable_posts):
+    assert search_ids(client, '') == []
+    assert search_ids(client, '"*') == []
+
+
+def test_admin_search_uses_index(admin_client, searchable_posts):
+    response = admin_client.get('/admin/blog/post/', {'q': 'нерпу'})
+    result = list(response.context['cl'].result_list)
+    assert result == [searchable_posts['text']]
+
+
+@pytest.mark.parametrize('backend', ('SQLiteFTSBackend',
+                                     'DatabaseSearchBackend'))
+def test_admin_search_is_not_limited(settings, monkeypatch, mixer,
+                                     admin_client, user, published_category,
+                                     backend):
+    settings.BLOG_SEARCH_BACKEND = f'blog.search.{backend}'
+    posts = mixer.cycle(3).blend('blog.Post', author=user,
+                                 category=published_category,
+                                 text='заметка про тюленей')
+    monkeypatch.setattr(getattr(search, backend).search_posts,
+                        '__defaults__', (1,))
+    response = admin_client.get('/admin/blog/post/', {'q': 'тюленей'})
+    assert set(response.context['cl'].result_list) == set(posts), (
+        'Убедитесь, что поиск в админке не ограничен числом результатов.'
+    )
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite FTS5')
+def test_rebuild_search_index(client, searchable_posts):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_search')
+    assert search_ids(client, 'нерпу') == []
+    call_command('rebuild_search_index')
+    assert search_ids(client, 'нерпу') == [searchable_posts['text'].id]
+
+
+def test_database_backend(settings, client, searchable_posts):
+    settings.BLOG_SEARCH_BACKEND = 'blog.search.DatabaseSearchBackend'
+    assert get_search_backend().__class__.__name__ == 'DatabaseSearchBackend'
+    assert search_ids(client, 'нерпу') == [searchable_posts['text'].id]
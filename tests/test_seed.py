@@ -0,0 +1,53 @@
+import io
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from blog.models import Category, Comment, Post
+from blog.search import get_search_backend
+from blog.seeding import iter_fixture
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+def test_iter_fixture_reads_in_chunks():
+    stream = io.StringIO('[ {"a": "x, ]"},\n {"b": [1, 2]} ]')
+    assert list(iter_fixture(stream, chunk_size=3)) == [
+        {'a': 'x, ]'}, {'b': [1, 2]}
+    ]
+
+
+def test_seed_loads_fixture_without_touching_timestamps():
+    call_command('seed', str(FIXTURE), stdout=io.StringIO())
+    category = Category.objects.get(slug='routine')
+    assert category.created_at.isoformat().startswith('2022-12-18T23:03:52')
+    assert Post.objects.count() == 39
+    assert get_user_model().objects.filter(username='leo').exists()
+
+
+def test_seed_generates_consistent_data():
+    call_command(
+        'seed', users=5, categories=2, locations=3, posts=120,
+        comments_per_post=2, batch_size=50, seed=1, stdout=io.StringIO()
+    )
+    assert get_user_model().objects.count() == 5
+    assert Post.objects.count() == 120
+    assert Comment.objects.exists()
+    assert not Post.objects.annotate(
+        actual=Count('comments')
+    ).exclude(comment_count=F('actual')).exists(), (
+        'Убедитесь, что счётчики комментариев совпадают с данными.'
+    )
+    post = Post.objects.order_by('?').first()
+    assert post.pk in get_search_backend().search_posts(post.title)
+
+    new_post = Post.objects.create(
+        title='После загрузки', text='Текст', pub_date=post.pub_date,
+        author=post.author
+    )
+    assert new_post.pk == 121
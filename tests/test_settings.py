@@ -0,0 +1,80 @@
+import os
+import runpy
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+SETTINGS_PATH = Path(settings.BASE_DIR) / 'blogicum' / 'settings.py'
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    """Значения настроек при заданных переменных окружения"""
+
+    def load(**env):
+        for name in list(os.environ):
+            if name.startswith('BLOGICUM_'):
+                monkeypatch.delenv(name)
+        for name, value in env.items():
+            monkeypatch.setenv(f'BLOGICUM_{name}', value)
+        return runpy.run_path(str(SETTINGS_PATH))
+
+    return load
+
+
+def test_cache_is_shared_by_default(load_settings):
+    config = load_settings()
+    assert config['SHARED_CACHE']
+    assert config['CACHES']['default']['BACKEND'].endswith(
+        'FileBasedCache'
+    )
+    assert load_settings(PROFILE='prod', SECRET_KEY='x')['SHARED_CACHE']
+
+
+def test_cache_backend_from_environment(load_settings):
+    config = load_settings(CACHE_BACKEND='memcached',
+                           CACHE_LOCATION='cache.local:11211')
+    assert config['CACHES']['default'] == {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': 'cache.local:11211',
+    }
+    assert not load_settings(PROFILE='test')['SHARED_CACHE']
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(CACHE_BACKEND='redis')
+
+
+def test_search_backend_follows_database_engine(load_settings):
+    assert load_settings()['BLOG_SEARCH_BACKEND'] == (
+        'blog.search.SQLiteFTSBackend'
+    )
+    assert load_settings(DB_ENGINE='postgresql')['BLOG_SEARCH_BACKEND'] == (
+        'blog.search.DatabaseSearchBackend'
+    )
+
+
+def test_sessions_skip_process_local_cache(load_settings):
+    config = load_settings()
+    assert config['SESSION_ENGINE'].endswith('cached_db')
+    assert config['AUTHENTICATION_BACKENDS'] == [
+        'blog.auth.CachedModelBackend'
+    ]
+    config = load_settings(CACHE_BACKEND='locmem')
+    assert config['SESSION_ENGINE'] == 'django.contrib.sessions.backends.db'
+    assert config['AUTHENTICATION_BACKENDS'] == [
+        'django.contrib.auth.backends.ModelBackend'
+    ]
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(CACHE_BACKEND='locmem', SESSION_ENGINE=(
+            'django.contrib.sessions.backends.cached_db'
+        ))
+
+
+def test_prod_requires_secret_key(load_settings):
+    assert load_settings()['SECRET_KEY'].startswith('django-insecure-')
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(PROFILE='prod')
+    assert load_settings(PROFILE='prod', SECRET_KEY='секрет')[
+        'SECRET_KEY'
+    ] == 'секрет'
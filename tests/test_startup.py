@@ -0,0 +1,11 @@
+from blog.startup import run_startup_benchmark
+
+
+def test_dev_only_apps_are_skipped_outside_dev():
+    report = run_startup_benchmark(('dev', 'prod'), repeat=1)
+    for result in report.values():
+        assert result['status'] == 200
+        assert result['setup_ms'] > 0 and result['first_request_ms'] > 0
+    assert report['prod']['apps'] == report['dev']['apps'] - 1
+    assert report['prod']['middleware'] == report['dev']['middleware'] - 1
+    assert report['prod']['modules'] < report['dev']['modules']
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import Context, Engine, RequestContext, engines
+from django.test import RequestFactory
+
+from blog.bench import run_render_benchmark, template_engine
+from blog.seeding import SyntheticData, finish_seeding
+from blog.templating import InliningLoader, warm_templates
+from blog.views import HomePage
+
+TEMPLATES = {
+    'blog/page.html': ('{% with name="страница" %}{% include "card.html" '
+                       'with title=name %}{% endwith %}'
+                       '{% include "card.html" only %}{{ title }}'),
+    'card.html': '[{{ title }}{% include "nested.html" %}]',
+    'nested.html': '{% with title="вложенный" %}({{ title }}){% endwith %}',
+}
+
+
+@pytest.fixture
+def engine():
+    return Engine(loaders=[(
+        'blog.templating.InliningLoader',
+        [('django.template.loaders.locmem.Loader', TEMPLATES)],
+        ['blog/*.html'],
+    )])
+
+
+def test_includes_are_inlined(engine):
+    loader = engine.template_loaders[0]
+    assert isinstance(loader, InliningLoader)
+    origin = next(loader.get_template_sources('blog/page.html'))
+    source = loader.get_contents(origin)
+    assert '"card.html" with' not in source
+    assert '{% include "card.html" only %}' in source
+    assert engine.get_template('blog/page.html').render(
+        Context({'title': 'внешний'})
+    ) == '[страница(вложенный)][(вложенный)]внешний'
+
+
+def test_other_templates_are_not_changed(engine):
+    loader = engine.template_loaders[0]
+    origin = next(loader.get_template_sources('card.html'))
+    assert loader.get_contents(origin) == TEMPLATES['card.html']
+
+
+@pytest.mark.django_db
+def test_inlined_feed_renders_like_included():
+    data = SyntheticData(seed=1)
+    data.posts(12, data.users(2), data.categories(1), data.locations(1), 0)
+    finish_seeding(recount=False)
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    context_data = HomePage.as_view()(request).context_data
+    pages = []
+    for loaders in ('uncached', 'inlined'):
+        cache.clear()
+        pages.append(template_engine(loaders).get_template(
+            'blog/index.html'
+        ).render(RequestContext(request, context_data)))
+    assert pages[0] == pages[1]
+
+    report = run_render_benchmark(renders=3, warmup=1)
+    assert report['posts'] == 10
+    assert set(report['loaders']) == {'uncached', 'cached', 'inlined'}
+    for result in report['loaders'].values():
+        assert 0 < result['p50_ms'] <= result['p95_ms']
+
+
+def test_warm_templates_fills_cached_loader(settings):
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], 'APP_DIRS': False,
+        'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': [(
+            'django.template.loaders.cached.Loader',
+            settings.TEMPLATE_LOADERS,
+        )]},
+    }]
+    loader = engines['django'].engine.template_loaders[0]
+    assert warm_templates() == len(loader.get_template_cache)
+    assert 'blog/index.html' in loader.get_template_cache